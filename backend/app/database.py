@@ -3,9 +3,12 @@ import logging
 import os
 from pathlib import Path
 
-from sqlalchemy import create_engine, text
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, create_engine, event, insert, inspect, make_url, select, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, raiseload, sessionmaker
 
 logger = logging.getLogger(__name__)
 
@@ -18,21 +21,171 @@ if "sqlite" in DATABASE_URL:
     db_path = DATABASE_URL.replace("sqlite:///", "")
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
+
+def _engine_options(database_url: str) -> dict:
+    """Connection pool (and bulk executemany) options for the write engine.
+
+    SQLite keeps the default pool: it has a single writer, so more connections would only wait on the
+    database lock. Server databases get a pool sized for concurrent uploads (overridable through
+    DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_RECYCLE), with stale connections detected before use.
+    """
+    if "sqlite" in database_url:
+        return {"connect_args": {"check_same_thread": False}}
+    options = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "30")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "3600")),
+        "pool_pre_ping": True,
+    }
+    # Send executemany() batches (bulk inserts) in as few round trips as the driver allows
+    driver = make_url(database_url).get_driver_name()
+    if driver == "psycopg2":
+        options["executemany_mode"] = "values_plus_batch"
+    elif driver == "pyodbc":
+        options["fast_executemany"] = True
+    return options
+
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+
+# Read-only engine for GET requests: with WAL, its connections never wait for the writer
+if "sqlite" in DATABASE_URL and db_path != ":memory:" and "?" not in db_path:
+    read_engine = create_engine(
+        f"sqlite:///file:{db_path}?mode=ro&uri=true",
+        connect_args={"check_same_thread": False},
+        pool_size=os.cpu_count() or 5
+    )
+else:
+    read_engine = engine
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection: WAL lets readers run alongside the writer."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+    _set_sqlite_read_pragmas(dbapi_connection, connection_record)
+
+
+def _set_sqlite_read_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection of the read-only engine. The journal mode is left alone: it is
+    stored in the database file (set by the write engine), and a mode=ro connection cannot change it."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA cache_size=-20000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _disable_pysqlite_transaction_handling(dbapi_connection, connection_record):
+    """Stop pysqlite from emitting its own (deferred) BEGIN, so _begin_immediate controls it."""
+    dbapi_connection.isolation_level = None
+
+
+def _begin_immediate(conn):
+    """Take the write lock when the transaction starts, rather than upgrading a deferred
+    transaction later, which fails with SQLITE_BUSY under concurrent writers."""
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+if "sqlite" in DATABASE_URL:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(engine, "connect", _disable_pysqlite_transaction_handling)
+    event.listen(engine, "begin", _begin_immediate)
+    if read_engine is not engine:
+        event.listen(read_engine, "connect", _set_sqlite_read_pragmas)
+
+# Create session factories. Objects stay loaded after commit (no SELECT per object to serialize the
+# response); values generated by the database are fetched at flush time instead (see Base below)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+def _raise_on_lazy_load(orm_execute_state):
+    """Add raiseload("*") to ORM SELECTs, so that a relationship read without an explicit
+    selectinload()/joinedload() option fails instead of issuing one query per row."""
+    if orm_execute_state.is_select and not orm_execute_state.is_relationship_load:
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
+
+
+# Development/test switch: set RAISE_ON_LAZY_LOAD=1 to catch accidental lazy loading (N+1 queries)
+if os.getenv("RAISE_ON_LAZY_LOAD") == "1":
+    event.listen(SessionLocal, "do_orm_execute", _raise_on_lazy_load)
+    event.listen(ReadSessionLocal, "do_orm_execute", _raise_on_lazy_load)
+
+
+class _EagerDefaults:
+    """Fetch SQL-generated column values (created_at / updated_at = func.now()) in the INSERT / UPDATE
+    itself (RETURNING where supported), rather than leaving them expired until the next access."""
+    __mapper_args__ = {"eager_defaults": True}
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for models
-Base = declarative_base()
+Base = declarative_base(cls=_EagerDefaults)
+
+
+def insert_unless_exists(db: Session, model, values: dict, index_elements: list):
+    """
+    Insert a row unless one with the same unique key already exists, in a single statement.
+
+    On SQLite and PostgreSQL this is INSERT ... ON CONFLICT (index_elements) DO NOTHING RETURNING: the
+    unique index does the existence check, with no separate SELECT and no race between check and insert.
+    Other databases fall back to a SELECT on the key followed by a plain INSERT.
+
+    Args:
+        db: Database session
+        model: Mapped class to insert into
+        values: Column values of the new row
+        index_elements: Columns of the unique index that identifies an existing row
+
+    Returns:
+        The created `model` instance, or None if a row with the same key already exists
+    """
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+        statement = (
+            dialect_insert(model).values(**values)
+            .on_conflict_do_nothing(index_elements=index_elements)
+            .returning(model)
+        )
+        return db.execute(statement).scalar_one_or_none()
+    key = and_(*(getattr(model, column) == values[column] for column in index_elements))
+    if db.execute(select(model.id).where(key)).first():
+        return None
+    return db.execute(insert(model).values(**values).returning(model)).scalar_one()
+
+
+def relax_commit_durability(db: Session) -> None:
+    """
+    Let the current transaction commit without waiting for its WAL flush to disk.
+
+    On PostgreSQL this is SET LOCAL synchronous_commit = OFF: it only lasts until the end of the current
+    transaction, so other requests sharing the pooled connection keep durable commits. A crash can lose
+    the last few such commits, but never leaves them half applied. SQLite connections already run
+    with synchronous=NORMAL in WAL mode (see _set_sqlite_pragmas), where commits do not fsync.
+
+    Args:
+        db: Database session, inside the transaction to relax
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SET LOCAL synchronous_commit = OFF"))
+
+
+def create_missing_tables() -> None:
+    """Create the schema on first boot (or when new models were added); no-op once all tables exist."""
+    existing_tables = set(inspect(engine).get_table_names())
+    missing_tables = set(Base.metadata.tables) - existing_tables
+    if missing_tables:
+        logger.info(f"Creating missing tables: {', '.join(sorted(missing_tables))}")
+        Base.metadata.create_all(bind=engine)
 
 
 def apply_sqlite_light_migrations() -> bool:
-    """Add columns / tables missing on older SQLite files (create_all does not ALTER).
+    """Add columns / tables / indexes missing on older SQLite files (create_all does not ALTER).
 
     Returns True if `average_unit_cost_after_trade` was added to portfolio transactions this run
     (caller should run cost-basis backfill).
@@ -51,6 +204,58 @@ def apply_sqlite_light_migrations() -> bool:
                     conn.execute(text("ALTER TABLE investment_portfolio_assets ADD COLUMN broker VARCHAR"))
                     logger.info("SQLite: added column investment_portfolio_assets.broker")
 
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_transactions_bank_account_date "
+                    "ON transactions (bank_name, account_name, date)"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_investment_observations_product_date "
+                    "ON investment_observations (product_id, observation_date)"
+                )
+            )
+            # transactions.category is NOT NULL with '' for uncategorized rows (existing files keep the
+            # nullable column definition, so only the values are backfilled)
+            result = conn.execute(text("UPDATE transactions SET category = '' WHERE category IS NULL"))
+            if result.rowcount:
+                logger.info(f"SQLite: set {result.rowcount} NULL transactions.category values to ''")
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_transactions_category "
+                    "ON transactions (category) WHERE category <> ''"
+                )
+            )
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_transactions_transaction_type "
+                    "ON transactions (transaction_type) WHERE transaction_type <> ''"
+                )
+            )
+            # Single-column indexes made redundant by the composite indexes above
+            conn.execute(text("DROP INDEX IF EXISTS ix_transactions_account_name"))
+            conn.execute(text("DROP INDEX IF EXISTS ix_accounts_account_name"))
+            conn.execute(text("DROP INDEX IF EXISTS ix_investment_observations_product_id"))
+
+            # Enum columns stored as SMALLINT codes: rewrite the names written by the former SQLEnum type
+            from .models import SmallIntEnum
+            for table in Base.metadata.sorted_tables:
+                for column in table.columns:
+                    if not isinstance(column.type, SmallIntEnum):
+                        continue
+                    names = {member.name: column.type.code_for(member) for member in column.type.enum_class}
+                    cases = " ".join(f"WHEN '{name}' THEN {code}" for name, code in names.items())
+                    quoted_names = ", ".join(f"'{name}'" for name in names)
+                    result = conn.execute(
+                        text(
+                            f"UPDATE {table.name} SET {column.name} = CASE {column.name} {cases} END "
+                            f"WHERE {column.name} IN ({quoted_names})"
+                        )
+                    )
+                    if result.rowcount:
+                        logger.info(f"SQLite: converted {result.rowcount} {table.name}.{column.name} values to codes")
+
             tx = conn.execute(
                 text("SELECT name FROM sqlite_master WHERE type='table' AND name='investment_portfolio_transactions'")
             ).fetchone()
@@ -137,10 +342,44 @@ def backfill_investment_average_unit_costs() -> None:
         logger.exception("SQLite: backfill average_unit_cost_after_trade failed")
 
 
-def get_db():
-    """Dependency for getting database session."""
-    db = SessionLocal()
+async def _close_session(db: Session) -> None:
+    """Close a dependency's session without blocking the event loop on the database."""
+    # Nothing to end when the session never used a connection (or committed), and only a WAL read
+    # snapshot to release on the SQLite read-only engine (no I/O, no lock to wait for): closing is then
+    # cheaper inline than a threadpool round trip, which would double the cost of a small GET
+    if not db.in_transaction() or (read_engine is not engine and db.get_bind() is read_engine):
+        db.close()
+    else:
+        # Rolls back the open transaction and resets the connection handed back to the pool: database
+        # round trips on a server database
+        await run_in_threadpool(db.close)
+
+
+async def get_db(request: Request):
+    """
+    Dependency for getting database session (read-only for GET requests).
+
+    An async generator, so FastAPI runs it on the event loop: a sync generator dependency has its setup
+    and its cleanup each sent to the threadpool, on every request. Setup is short (the session checks
+    out a connection only when first used); cleanup only goes to the threadpool when closing has a
+    transaction to end (see _close_session).
+    """
+    db = ReadSessionLocal() if request.method == "GET" else SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        await _close_session(db)
+
+
+async def get_read_db():
+    """
+    Dependency for getting a read-only database session, for non-GET endpoints that only read.
+
+    On SQLite, a get_db session of a POST request starts with BEGIN IMMEDIATE: it would wait for (and
+    then block) concurrent writers although it writes nothing.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        await _close_session(db)
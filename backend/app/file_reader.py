@@ -3,16 +3,189 @@ File reader module for handling files.
 
 This module provides functionality to read and parse files in various formats (Excel and CSV).
 It includes automatic file type detection, encoding handling for CSV files, and support for reading multiple Excel sheets.
+Files are read from a path or from a binary file object (e.g. an upload still spooled in memory).
+Parsed DataFrames are cached on disk as parquet, keyed by the file content hash, so re-uploading the same file skips parsing.
 """
 
+import codecs
+import contextlib
+import functools
+import hashlib
+import time
 import pandas as pd
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Callable, Iterator, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)    
 
+# Prefer the Rust-based calamine engine (pandas >= 2.2 with python-calamine installed),
+# otherwise let pandas pick its default engine (openpyxl for .xlsx, xlrd for .xls)
+try:
+    import python_calamine  # noqa: F401
+    _CALAMINE_AVAILABLE = tuple(int(part) for part in pd.__version__.split(".")[:2]) >= (2, 2)
+except ImportError:
+    _CALAMINE_AVAILABLE = False
+
+EXCEL_ENGINE: Optional[str] = "calamine" if _CALAMINE_AVAILABLE else None
+
+# Read whole CSV files with the multi-threaded Polars parser when polars (and pyarrow, needed to
+# convert the result to pandas) are installed, otherwise with the pandas C parser
+try:
+    import polars as pl
+    import pyarrow  # noqa: F401
+    _POLARS_AVAILABLE = True
+except ImportError:
+    _POLARS_AVAILABLE = False
+
+# Parsed DataFrames are cached as parquet files, which needs pyarrow: without it caching is disabled
+try:
+    import pyarrow  # noqa: F401
+    _PYARROW_AVAILABLE = True
+except ImportError:
+    _PYARROW_AVAILABLE = False
+
+# Rows used by Polars to infer the CSV column types
+POLARS_INFER_SCHEMA_ROWS = 10_000
+
+# Byte order marks, checked longest first (the UTF-32 LE BOM starts with the UTF-16 LE one)
+_BOM_ENCODINGS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Encodings tried in order on CSV files without a byte order mark. Italian bank exports that are not
+# UTF-8 are usually Windows-1252 (where 0x80 is the euro sign); latin-1, which accepts every byte, is
+# the last resort
+_CSV_ENCODINGS = ['utf-8', 'cp1252']
+_CSV_FALLBACK_ENCODING = 'latin-1'
+
+# A file to read: a path, or a seekable binary file object (read from its start)
+FileSource = Union[Path, BinaryIO]
+
+# Supported file extensions and the reader used for each
+_FILE_TYPES_BY_SUFFIX = {'.xlsx': 'excel', '.xls': 'excel', '.csv': 'csv'}
+
+# Directory for cached parsed DataFrames
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache"
+# Maximum total size of the cache entries kept on disk (oldest are evicted first)
+MAX_CACHE_BYTES = 256 << 20
+# Cache entries older than this (in seconds) are evicted
+MAX_CACHE_AGE = 7 * 24 * 3600
+# Bump to invalidate existing cache entries when the reading logic changes
+_CACHE_VERSION = 5
+
+
+def _rewind(source: FileSource) -> None:
+    """Move a file object source back to its start, so that it can be read (again) whole."""
+    if not isinstance(source, Path):
+        source.seek(0)
+
+
+@contextlib.contextmanager
+def _open_binary(source: FileSource) -> Iterator[BinaryIO]:
+    """Open a path for binary reading, or lend a file object source rewound (and rewind it after use)."""
+    if isinstance(source, Path):
+        with open(source, 'rb') as f:
+            yield f
+        return
+    _rewind(source)
+    try:
+        yield source
+    finally:
+        _rewind(source)
+
+
+def _source_name(source: FileSource, filename: Optional[str]) -> str:
+    """Return the file name of a source: `filename` if given, else the name of the path."""
+    if filename:
+        return filename
+    if isinstance(source, Path):
+        return source.name
+    raise ValueError("A file name is required to read a file object (it selects the reader)")
+
+
+def _file_hash(file_path: FileSource, block_size: int = 1 << 20) -> str:
+    """Return the hex digest of the file content."""
+    digest = hashlib.blake2b(digest_size=16)
+    with _open_binary(file_path) as f:
+        while block := f.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_by_file_hash(read: Callable[..., Union[pd.DataFrame, Iterator[pd.DataFrame]]]) -> Callable[..., Union[pd.DataFrame, Iterator[pd.DataFrame]]]:
+    """
+    Cache the DataFrame returned by a FileReader method on disk.
+
+    The cache key is the file content hash plus the reading options, so the cache is hit
+    whenever the same bytes are read again, whatever the file name or modification time.
+    Caching is disabled when the reader has no cache_dir or pyarrow is not installed, and chunked
+    reads are never cached. A DataFrame that parquet cannot store (e.g. a column mixing strings and
+    numbers) is returned uncached.
+    """
+    @functools.wraps(read)
+    def wrapper(
+        self: "FileReader",
+        file_path: FileSource,
+        skiprows: Optional[int] = None,
+        skipfooter: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        filename: Optional[str] = None
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        if self.cache_dir is None or chunksize is not None or not _PYARROW_AVAILABLE:
+            return read(self, file_path, skiprows=skiprows, skipfooter=skipfooter, chunksize=chunksize, filename=filename)
+
+        file_name = _source_name(file_path, filename)
+
+        key = f"v{_CACHE_VERSION}-{_file_hash(file_path)}-{skiprows}-{skipfooter}"
+        cache_path = self.cache_dir / f"{key}.parquet"
+        if cache_path.exists():
+            try:
+                df = pd.read_parquet(cache_path)
+                logger.info(f"Read {file_name} from cache")
+                return df
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable cache entry {cache_path.name}: {e}")
+
+        df = read(self, file_path, skiprows=skiprows, skipfooter=skipfooter, filename=filename)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(cache_path)
+            self._evict_cache_entries()
+        except Exception as e:
+            cache_path.unlink(missing_ok=True)
+            logger.warning(f"Could not cache parsed file {file_name}: {e}")
+        return df
+
+    return wrapper
+
+
 class FileReader:
+    def __init__(self, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR):
+        """
+        Args:
+            cache_dir: Directory where parsed DataFrames are cached, or None to disable caching
+        """
+        self.cache_dir = cache_dir
+
+    def _evict_cache_entries(self) -> None:
+        """Remove the cache entries older than MAX_CACHE_AGE, then the oldest ones beyond MAX_CACHE_BYTES."""
+        entries = sorted(
+            ((entry, entry.stat()) for entry in self.cache_dir.iterdir() if entry.is_file()),
+            key=lambda item: item[1].st_mtime,
+            reverse=True
+        )
+        oldest_mtime = time.time() - MAX_CACHE_AGE
+        total_size = 0
+        for entry, stat in entries:
+            total_size += stat.st_size
+            if stat.st_mtime < oldest_mtime or total_size > MAX_CACHE_BYTES:
+                entry.unlink(missing_ok=True)
+
     def detect_file_type(self, file_path: Path) -> str:
         """
         Detect file type from extension.
@@ -24,48 +197,185 @@ class FileReader:
             File type: 'excel', 'csv', or raises ValueError
         """
         suffix = file_path.suffix.lower()
-        if suffix in ['.xlsx', '.xls']:
-            return 'excel'
-        elif suffix == '.csv':
-            return 'csv'
-        else:
+        file_type = _FILE_TYPES_BY_SUFFIX.get(suffix)
+        if file_type is None:
             raise ValueError(f"Unsupported file type: {suffix}. Supported: .xlsx, .xls, .csv")
+        return file_type
+
+    @staticmethod
+    def _decodes_as(f: BinaryIO, head: bytes, encoding: str, block_size: int) -> bool:
+        """Check whether the whole file (starting with the already read `head`) decodes with `encoding`."""
+        decoder = codecs.getincrementaldecoder(encoding)()
+        f.seek(len(head))
+        try:
+            decoder.decode(head)
+            while block := f.read(block_size):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return False
+        return True
+
+    def detect_csv_encoding(self, file_path: FileSource, block_size: int = 1 << 20) -> str:
+        """
+        Detect the encoding of a CSV file.
+
+        A byte order mark decides the encoding right away. Otherwise the file is validated
+        against each of _CSV_ENCODINGS in turn, block by block with an incremental decoder,
+        which is much cheaper than letting pandas tokenize the whole file before failing.
+        A file that none of them decodes is read as latin-1, which accepts every byte.
+
+        Args:
+            file_path: Path to the CSV file, or CSV file object
+            block_size: Number of bytes read per block
+
+        Returns:
+            Encoding name: 'utf-8', 'utf-8-sig', 'utf-16', 'utf-32', 'cp1252' or 'latin-1'
+        """
+        with _open_binary(file_path) as f:
+            head = f.read(block_size)
+            for bom, encoding in _BOM_ENCODINGS:
+                if head.startswith(bom):
+                    return encoding
 
-    def read_file(self, file_path: Path, skiprows: Optional[int] = None, skipfooter: Optional[int] = None) -> pd.DataFrame:
+            for encoding in _CSV_ENCODINGS:
+                if self._decodes_as(f, head, encoding, block_size):
+                    return encoding
+        return _CSV_FALLBACK_ENCODING
+
+    @staticmethod
+    def _sheet_row_count(excel_file: pd.ExcelFile, sheet_name: str) -> Optional[int]:
+        """
+        Return the number of rows of a sheet from the workbook metadata, without reading its cells.
+
+        openpyxl (opened read-only by pandas) takes it from the sheet dimension, xlrd from the
+        already loaded sheet. Returns None when it is unknown (calamine, missing dimension).
+        """
+        if excel_file.engine == 'openpyxl':
+            return excel_file.book[sheet_name].max_row
+        if excel_file.engine == 'xlrd':
+            return excel_file.book.sheet_by_name(sheet_name).nrows
+        return None
+
+    def _read_csv_polars(self, file_path: FileSource, encoding: str) -> pd.DataFrame:
+        """
+        Read a whole CSV file with Polars and convert it to a pandas DataFrame.
+
+        Polars decodes UTF-8 natively; other encodings are decoded in Python first.
+        Column types are inferred from the first POLARS_INFER_SCHEMA_ROWS rows (inferring them from the
+        whole file is several times slower): a later value that does not fit raises, and read_file
+        then falls back to pandas.
+        """
+        _rewind(file_path)
+        df = pl.read_csv(
+            file_path,
+            encoding='utf8' if encoding == 'utf-8' else encoding,
+            infer_schema_length=POLARS_INFER_SCHEMA_ROWS
+        )
+        return df.to_pandas()
+
+    def _read_excel(
+        self,
+        file_path: FileSource,
+        engine: Optional[str],
+        skiprows: Optional[int] = None,
+        skipfooter: Optional[int] = None,
+        file_name: Optional[str] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Read the first non-empty sheet of an Excel file.
+
+        Args:
+            file_path: Path to the Excel file, or Excel file object
+            engine: pandas Excel engine, or None to let pandas pick one from the extension (from the
+                content for a file object)
+            skiprows: Optional number of rows to skip from the top
+            skipfooter: Optional number of rows to skip from the bottom
+            file_name: Name of the file, for logging
+
+        Returns:
+            pandas DataFrame, or None if every sheet is empty
+        """
+        # Open the workbook once and parse sheets from the same handle;
+        # use context manager to ensure file handle is properly closed
+        _rewind(file_path)
+        with pd.ExcelFile(file_path, engine=engine) as excel_file:
+            for sheet_name in excel_file.sheet_names:
+                # Skip sheets the workbook metadata reports as too short to hold a header and a data
+                # row (covers, notes) without parsing them
+                row_count = self._sheet_row_count(excel_file, sheet_name)
+                if row_count is not None and row_count < (skiprows or 0) + 2:
+                    continue
+                df = excel_file.parse(sheet_name, skiprows=skiprows, skipfooter=skipfooter)
+                if not df.empty:
+                    logger.info(f"Read sheet '{sheet_name}' from {file_name}")
+                    return df
+        return None
+
+    @cache_by_file_hash
+    def read_file(
+        self,
+        file_path: FileSource,
+        skiprows: Optional[int] = None,
+        skipfooter: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        filename: Optional[str] = None
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
         """
         Read file into pandas DataFrame.
 
         Args:
-            file_path: Path to the file
+            file_path: Path to the file, or binary file object with the file content (e.g. an upload,
+                read without saving it to disk first)
             skiprows: Optional number of rows to skip from the top
             skipfooter: Optional number of rows to skip from the bottom
+            chunksize: Optional number of rows per chunk. When set, an iterator of DataFrames
+                is returned instead, so that large CSV files can be processed in batches
+                without loading the whole file in memory (Excel files are read whole and
+                then split into chunks)
+            filename: Name of the file, whose extension selects the reader. Required for a file object,
+                defaults to the name of the path otherwise
         Returns:
-            pandas DataFrame
+            pandas DataFrame, or an iterator of DataFrames if chunksize is set
         """
-        file_type = self.detect_file_type(file_path)
+        file_name = _source_name(file_path, filename)
+        file_type = self.detect_file_type(Path(file_name))
 
         try:
             if file_type == 'excel':
-                # Try reading all sheets, return first non-empty one
-                # Use context manager to ensure file handle is properly closed
-                with pd.ExcelFile(file_path) as excel_file:
-                    for sheet_name in excel_file.sheet_names:
-                        df = pd.read_excel(excel_file, sheet_name=sheet_name, skiprows=skiprows, skipfooter=skipfooter)
-                        if not df.empty:
-                            logger.info(f"Read sheet '{sheet_name}' from {file_path.name}")
-                            return df
+                try:
+                    df = self._read_excel(file_path, EXCEL_ENGINE, skiprows=skiprows, skipfooter=skipfooter, file_name=file_name)
+                except Exception as e:
+                    if EXCEL_ENGINE is None:
+                        raise
+                    # calamine rejects a few files the reference engines accept (e.g. malformed .xls)
+                    logger.warning(f"Engine {EXCEL_ENGINE} could not read {file_name} ({e}), retrying with the default engine")
+                    df = self._read_excel(file_path, None, skiprows=skiprows, skipfooter=skipfooter, file_name=file_name)
+                if df is None:
                     raise ValueError("No data found in Excel file")
+                if chunksize is not None:
+                    return (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+                return df
             else:  # CSV
-                # Try different encodings
-                encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-                for encoding in encodings:
+                # Detect the encoding up front so the file is tokenized only once
+                encoding = self.detect_csv_encoding(file_path)
+                if chunksize is not None:
+                    logger.info(f"Streaming CSV file {file_name} with encoding {encoding} in chunks of {chunksize} rows")
+                    _rewind(file_path)
+                    return pd.read_csv(file_path, encoding=encoding, chunksize=chunksize)
+                if _POLARS_AVAILABLE:
                     try:
-                        df = pd.read_csv(file_path, encoding=encoding)
-                        logger.info(f"Read CSV file {file_path.name} with encoding {encoding}")
+                        df = self._read_csv_polars(file_path, encoding)
+                        logger.info(f"Read CSV file {file_name} with encoding {encoding} (polars)")
                         return df
-                    except UnicodeDecodeError:
-                        continue
-                raise ValueError(f"Could not read CSV file with any supported encoding: {file_path}")
+                    except Exception as e:
+                        # Polars is stricter than pandas (rows with extra fields, values not matching the inferred types)
+                        logger.warning(f"Polars could not read {file_name} ({e}), retrying with pandas")
+                # low_memory=False infers each column's dtype in one pass instead of per internal chunk
+                _rewind(file_path)
+                df = pd.read_csv(file_path, encoding=encoding, engine='c', low_memory=False)
+                logger.info(f"Read CSV file {file_name} with encoding {encoding}")
+                return df
         except Exception as e:
-            logger.error(f"Error reading file {file_path}: {e}")
+            logger.error(f"Error reading file {file_name}: {e}")
             raise
\ No newline at end of file
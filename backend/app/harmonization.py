@@ -1,15 +1,56 @@
 """Merge new data with existing data."""
 import logging
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Sequence, Tuple, TypeVar, Any, Union
 from datetime import date
+import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Boolean, Column, Date, Float, Integer, MetaData, String, Table, delete, exists, func, insert, select, true, tuple_
+from sqlalchemy.exc import IntegrityError
 
-from .models import Transaction
-from .transactions_preprocessing import StandardizedTransaction
+from .models import EmptyIfNullString, Transaction
+from .transactions_preprocessing import STANDARDIZED_COLUMNS, StandardizedTransaction, normalize_transactions_dataframe
 
 logger = logging.getLogger(__name__)
 
+# Transactions checked by detect_duplicates: StandardizedTransaction, or any object with the same attributes
+TransactionT = TypeVar("TransactionT")
+
+# Temporary (per-connection) table holding the batch processed by harmonize_and_insert, so that
+# duplicate detection and insertion run as set-based SQL against the transactions table
+_staging_metadata = MetaData()
+staging_transactions = Table(
+    "staging_transactions",
+    _staging_metadata,
+    Column("seq", Integer, primary_key=True),
+    Column("bank_name", String),
+    Column("account_name", String),
+    Column("date", Date),
+    Column("amount", Float),
+    Column("description", String),
+    Column("details", String),
+    Column("category", EmptyIfNullString),
+    Column("transaction_type", String),
+    Column("is_special", Boolean),
+    # Normalized duplicate keys (lowercased names, stripped description with '' as NULL)
+    Column("key_bank_name", String),
+    Column("key_account_name", String),
+    Column("key_description", String),
+    prefixes=["TEMPORARY"],
+)
+
+# Stored spellings of the staged accounts (bank_name / account_name as written in transactions, with
+# their lowercased keys), so that staged rows are matched on the bare transactions columns, through
+# idx_transactions_bank_account_date, rather than on lower(bank_name) / lower(account_name)
+staging_accounts = Table(
+    "staging_accounts",
+    _staging_metadata,
+    Column("key_bank_name", String),
+    Column("key_account_name", String),
+    Column("bank_name", String),
+    Column("account_name", String),
+    prefixes=["TEMPORARY"],
+)
+
 
 def get_last_observation_date(db: Session, bank_name: str, account_name: str) -> Optional[date]:
     """
@@ -34,10 +75,40 @@ def get_last_observation_date(db: Session, bank_name: str, account_name: str) ->
         return None
 
 
+def _get_existing_keys(
+    db: Session,
+    bank_name: Optional[str],
+    account_name: Optional[str],
+    start_date: date,
+    end_date: date
+) -> List[Tuple[date, float, Optional[str]]]:
+    """
+    Load the (date, amount, description) duplicate keys of existing transactions for one account.
+    
+    Args:
+        db: Database session
+        bank_name: Lowercased bank name
+        account_name: Lowercased account name
+        start_date: First date of the range to load
+        end_date: Last date of the range to load
+        
+    Returns:
+        List of (date, amount, description) tuples, with empty descriptions normalized to None
+    """
+    # Check against database (case-insensitive for bank_name and account_name)
+    rows = db.query(Transaction.date, Transaction.amount, Transaction.description).filter(
+        func.lower(Transaction.bank_name) == bank_name,
+        func.lower(Transaction.account_name) == account_name,
+        Transaction.date.between(start_date, end_date)
+    ).all()
+    # Empty descriptions in the database match missing ones in the file
+    return [(row_date, row_amount, row_description or None) for row_date, row_amount, row_description in rows]
+
+
 def detect_duplicates(
     db: Session, 
-    transactions: List[StandardizedTransaction]
-) -> Tuple[List[StandardizedTransaction], List[Dict[str, Any]]]:
+    transactions: List[TransactionT]
+) -> Tuple[List[TransactionT], List[Dict[str, Any]]]:
     """
     Detect duplicate transactions by checking against existing database records.
     
@@ -50,11 +121,12 @@ def detect_duplicates(
     
     Args:
         db: Database session
-        transactions: List of StandardizedTransaction objects to check
+        transactions: List of StandardizedTransaction objects to check (or any objects with the
+            same attributes, e.g. the upload router's ParsedTransaction)
         
     Returns:
         Tuple of (new_transactions, duplicate_info_list)
-        - new_transactions: List of transactions that don't exist in DB
+        - new_transactions: List of transactions that don't exist in DB (the input objects themselves)
         - duplicate_info_list: List of dicts with duplicate transaction details
     """
     new_transactions = []
@@ -64,60 +136,191 @@ def detect_duplicates(
         logger.info("No transactions to check for duplicates")
         return new_transactions, duplicate_info_list
     
-    for transaction in transactions:
-        try:
-            # Normalize values for comparison
-            trans_bank_name = transaction.bank_name.lower() if transaction.bank_name else None
-            trans_account_name = transaction.account_name.lower() if transaction.account_name else None
-            # Normalize description: strip whitespace and treat empty string as None
-            trans_description = transaction.description.strip() if transaction.description else None
-            if trans_description == "":
-                trans_description = None
-            
-            # Check if transaction exists in database (case-insensitive for bank_name and account_name)
-            # Also handle description comparison: match if both are None/empty or if stripped values match
-            existing = db.query(Transaction).filter(
-                func.lower(Transaction.bank_name) == trans_bank_name,
-                func.lower(Transaction.account_name) == trans_account_name,
-                Transaction.date == transaction.date,
-                Transaction.amount == transaction.amount
-            ).filter(
-                # Description match: either both are None/empty, or stripped values are equal
-                (Transaction.description == trans_description) |
-                (
-                    (Transaction.description == None) & (trans_description == None)
-                ) |
-                (
-                    (Transaction.description == "") & (trans_description == None)
-                ) |
-                (
-                    (Transaction.description == None) & (trans_description == "")
-                )
-            ).first()
-            
-            if existing:
-                # Transaction is a duplicate
-                duplicate_info_list.append({
-                    "bank_name": transaction.bank_name,
-                    "account_name": transaction.account_name,
-                    "date": transaction.date,
-                    "amount": transaction.amount,
-                    "description": transaction.description,
-                    "details": transaction.details,
-                    "category": transaction.category,
-                    "transaction_type": transaction.transaction_type
-                })
-            else:
-                new_transactions.append(transaction)
-                
-        except Exception as e:
-            logger.error(f"Error checking duplicate for transaction {transaction.date} {transaction.description}: {e}")
-            # On error, treat as new transaction (safer to include than exclude)
+    # Match the whole batch with the existing records through detect_duplicates_dataframe (one
+    # query per (bank, account) group and a single merge) instead of a set lookup per transaction
+    keys = pd.DataFrame({
+        column: [getattr(transaction, column) for transaction in transactions]
+        for column in ('bank_name', 'account_name', 'date', 'amount', 'description')
+    })
+    _, duplicates_df = detect_duplicates_dataframe(db, keys)
+    duplicate_positions = set(duplicates_df.index)
+    
+    for position, transaction in enumerate(transactions):
+        if position in duplicate_positions:
+            # Transaction is a duplicate
+            duplicate_info_list.append({
+                "bank_name": transaction.bank_name,
+                "account_name": transaction.account_name,
+                "date": transaction.date,
+                "amount": transaction.amount,
+                "description": transaction.description,
+                "details": transaction.details,
+                "category": transaction.category,
+                "transaction_type": transaction.transaction_type
+            })
+        else:
             new_transactions.append(transaction)
     
     return new_transactions, duplicate_info_list
 
 
+def detect_duplicates_dataframe(db: Session, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Vectorized variant of detect_duplicates for a DataFrame of standardized transactions.
+    
+    Uses the matching rules of detect_duplicates (which delegates to it), comparing the whole batch
+    with the existing records through a single pandas merge instead of a Python loop.
+    
+    Args:
+        db: Database session
+        df: DataFrame with at least the columns bank_name, account_name, date, amount, description
+        
+    Returns:
+        Tuple of (new_df, duplicates_df), both subsets of the input DataFrame
+    """
+    if df.empty:
+        logger.info("No transactions to check for duplicates")
+        return df, df
+    
+    key_columns = ['_bank', '_account', '_date', 'amount', '_description']
+    keys = pd.DataFrame({
+        '_bank': df['bank_name'].str.lower(),
+        '_account': df['account_name'].str.lower(),
+        '_date': pd.to_datetime(df['date'], format='ISO8601', cache=True).dt.date,
+        'amount': df['amount'].astype(float),
+        # Normalize description: strip whitespace and treat empty string as None
+        '_description': df['description'].astype(object).where(df['description'].notna(), None).str.strip().replace('', None),
+    }, index=df.index)
+    
+    existing_frames = []
+    for (bank_name, account_name), group in keys.groupby(['_bank', '_account'], dropna=False, sort=False):
+        bank_name = None if pd.isna(bank_name) else bank_name
+        account_name = None if pd.isna(account_name) else account_name
+        try:
+            rows = _get_existing_keys(db, bank_name, account_name, group['_date'].min(), group['_date'].max())
+        except Exception as e:
+            logger.error(f"Error loading existing transactions for {bank_name}/{account_name}: {e}")
+            # On error, treat the group as new transactions (safer to include than exclude)
+            continue
+        if not rows:
+            continue
+        existing = pd.DataFrame.from_records(rows, columns=['_date', 'amount', '_description'])
+        existing.insert(0, '_account', account_name)
+        existing.insert(0, '_bank', bank_name)
+        existing_frames.append(existing)
+    
+    if not existing_frames:
+        return df, df.iloc[0:0]
+    
+    existing = pd.concat(existing_frames, ignore_index=True).drop_duplicates()
+    existing['_exists'] = True
+    merged = keys.reset_index().merge(existing, on=key_columns, how='left').set_index('index')
+    is_duplicate = merged['_exists'].eq(True).reindex(df.index)
+    return df[~is_duplicate], df[is_duplicate]
+
+
+def _stage_transactions(db: Session, transactions: Union[List[StandardizedTransaction], pd.DataFrame]) -> None:
+    """
+    Load transactions into the (emptied) staging table with a single executemany, and the stored
+    spellings of their accounts into staging_accounts.
+    
+    Args:
+        db: Database session
+        transactions: List of StandardizedTransaction objects, or a DataFrame returned by
+            normalize_transactions_dataframe
+    """
+    connection = db.connection()
+    staging_transactions.create(connection, checkfirst=True)
+    staging_accounts.create(connection, checkfirst=True)
+    _clear_staging(db)
+    if isinstance(transactions, pd.DataFrame):
+        frame = transactions.reset_index(drop=True)
+        frame['seq'] = frame.index
+        frame['key_bank_name'] = frame['bank_name'].str.lower()
+        frame['key_account_name'] = frame['account_name'].str.lower()
+        # Normalize description: strip whitespace and treat empty string as None
+        frame['key_description'] = frame['description'].str.strip().replace('', None)
+        frame = frame.astype(object)
+        rows = frame.where(frame.notna(), None).to_dict('records')
+    else:
+        rows = []
+        for seq, transaction in enumerate(transactions):
+            row = transaction.to_dict()
+            row["seq"] = seq
+            row["key_bank_name"] = transaction.bank_name.lower() if transaction.bank_name else None
+            row["key_account_name"] = transaction.account_name.lower() if transaction.account_name else None
+            # Normalize description: strip whitespace and treat empty string as None
+            row["key_description"] = (transaction.description.strip() or None) if transaction.description else None
+            rows.append(row)
+    db.execute(insert(staging_transactions), rows)
+    
+    # One pass over the transactions index for the whole batch (rather than one lower() scan per staged row)
+    staged = staging_transactions.c
+    stored_keys = (func.lower(Transaction.bank_name), func.lower(Transaction.account_name))
+    db.execute(insert(staging_accounts).from_select(
+        ["key_bank_name", "key_account_name", "bank_name", "account_name"],
+        select(*stored_keys, Transaction.bank_name, Transaction.account_name).distinct().where(
+            tuple_(*stored_keys).in_(select(staged.key_bank_name, staged.key_account_name))
+        )
+    ))
+
+
+def _clear_staging(db: Session) -> None:
+    """Empty the staging tables."""
+    db.execute(delete(staging_transactions))
+    db.execute(delete(staging_accounts))
+
+
+def _staged_transaction_exists():
+    """EXISTS clause matching a staged row against transactions with the detect_duplicates rules."""
+    staged = staging_transactions.c
+    accounts = staging_accounts.c
+    return exists().where(
+        # Case-insensitive account match, resolved to the stored spellings of the staged account
+        accounts.key_bank_name == staged.key_bank_name,
+        accounts.key_account_name == staged.key_account_name,
+        Transaction.bank_name == accounts.bank_name,
+        Transaction.account_name == accounts.account_name,
+        Transaction.date == staged.date,
+        Transaction.amount == staged.amount,
+        # Empty descriptions in the database match missing ones in the file
+        func.nullif(Transaction.description, "").is_not_distinct_from(staged.key_description)
+    ).correlate(staging_transactions)
+
+
+def bulk_insert_transactions(
+    db: Session,
+    transactions: Sequence[Union[StandardizedTransaction, Dict[str, Any]]],
+    batch_size: int = 10_000
+) -> List[int]:
+    """
+    Insert transactions with one executemany per batch, bypassing the ORM unit of work.
+    
+    The caller is responsible for committing (or rolling back) the session.
+    
+    Args:
+        db: Database session
+        transactions: StandardizedTransaction objects, or dicts of Transaction column values
+        batch_size: Maximum number of rows sent per INSERT statement
+        
+    Returns:
+        Ids of the inserted transactions, in input order
+    """
+    # No sort_by_parameter_order: SQLite would then send one statement per row. Ids are assigned in
+    # input order, so sorting them gives the same result.
+    # Core INSERT on the table rather than the ORM bulk path: the ORM leaves out None values of columns
+    # with a default (category), which splits the batch into one statement per run of same-keyed rows
+    statement = insert(Transaction.__table__).returning(Transaction.id)
+    inserted_ids: List[int] = []
+    for start in range(0, len(transactions), batch_size):
+        rows = [
+            transaction.to_dict() if isinstance(transaction, StandardizedTransaction) else transaction
+            for transaction in transactions[start:start + batch_size]
+        ]
+        inserted_ids.extend(sorted(db.execute(statement, rows).scalars()))
+    return inserted_ids
+
+
 def display_duplicates(duplicates: List[Dict[str, Any]], bank_name: str, account_name: str, last_obs_date: Optional[date]) -> None:
     """
     Format and display duplicate transactions in a readable format.
@@ -157,7 +360,7 @@ def display_duplicates(duplicates: List[Dict[str, Any]], bank_name: str, account
 
 def harmonize_and_insert(
     db: Session,
-    transactions: List[StandardizedTransaction],
+    transactions: Union[List[StandardizedTransaction], pd.DataFrame],
     bank_name: str,
     account_name: str,
     require_confirmation: bool = False
@@ -167,7 +370,8 @@ def harmonize_and_insert(
     
     Args:
         db: Database session
-        transactions: List of StandardizedTransaction objects to process
+        transactions: List of StandardizedTransaction objects, or a DataFrame of standardized
+            transactions (parsed column-wise, without building StandardizedTransaction objects)
         bank_name: Bank name (used for logging and last observation date)
         account_name: Account name (used for logging and last observation date)
         require_confirmation: If True, display duplicates and wait for user confirmation
@@ -176,38 +380,79 @@ def harmonize_and_insert(
         Dictionary with statistics:
         {
             "inserted": int,
+            "inserted_ids": List[int],
             "skipped": int,
             "last_obs_date": Optional[date],
             "confirmed": bool
         }
     """
-    if not transactions:
+    if isinstance(transactions, pd.DataFrame):
+        transactions = normalize_transactions_dataframe(transactions)
+    
+    if len(transactions) == 0:
         logger.info("No transactions to harmonize")
         return {
             "inserted": 0,
+            "inserted_ids": [],
             "skipped": 0,
             "last_obs_date": None,
             "confirmed": False
         }
     
-    # Get last observation date
-    last_obs_date = get_last_observation_date(db, bank_name, account_name)
+    # Stage the batch so that duplicates are found (and new rows inserted) by SQL joins
+    # against the transactions index instead of Python comparisons
+    _stage_transactions(db, transactions)
+    duplicate_columns = [name for name in STANDARDIZED_COLUMNS if name != "is_special"]
+    duplicates = (
+        select(staging_transactions.c.seq, *[staging_transactions.c[name] for name in duplicate_columns])
+        .where(_staged_transaction_exists())
+        .subquery()
+    )
+    # The last observation date comes from the same statement (instead of a get_last_observation_date
+    # roundtrip): a one-row anchor holding it is outer joined with the duplicates, so that it is
+    # returned even when there are none (a single row with a NULL seq)
+    last_date = select(func.max(Transaction.date)).where(
+        Transaction.bank_name == bank_name,
+        Transaction.account_name == account_name
+    ).scalar_subquery()
+    anchor = select(last_date.label("last_obs_date")).subquery()
+    rows = db.execute(
+        select(anchor.c.last_obs_date, duplicates)
+        .select_from(anchor.outerjoin(duplicates, true()))
+        .order_by(duplicates.c.seq)
+    ).mappings().all()
+    last_obs_date = rows[0]["last_obs_date"]
+    duplicate_info_list = [{name: row[name] for name in duplicate_columns} for row in rows if row["seq"] is not None]
+    new_count = len(transactions) - len(duplicate_info_list)
     
     if last_obs_date:
         logger.info(f"Last observation date for {bank_name}/{account_name}: {last_obs_date}")
     else:
         logger.info(f"Last observation date for {bank_name}/{account_name}: No previous transactions")
     
-    # Detect duplicates
-    new_transactions, duplicate_info_list = detect_duplicates(db, transactions)
-    
-    logger.info(f"Found {len(duplicate_info_list)} duplicate transactions")
+    if duplicate_info_list:
+        # One summary line per batch; the per-row listing is only built when debugging
+        duplicate_dates = [dup["date"] for dup in duplicate_info_list]
+        logger.info(
+            f"Found {len(duplicate_info_list)} duplicate transactions for {bank_name}/{account_name} "
+            f"between {min(duplicate_dates)} and {max(duplicate_dates)}"
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Duplicate transactions (date;amount;description):\n" + "\n".join(
+                    f"{dup['date']};{dup['amount']};{dup['description'] or ''}" for dup in duplicate_info_list
+                )
+            )
+    else:
+        logger.info(f"Found 0 duplicate transactions for {bank_name}/{account_name}")
     
     # If no new transactions, return early
-    if not new_transactions:
+    if not new_count:
+        _clear_staging(db)
         logger.info("No new transactions to insert (all are duplicates)")
         return {
             "inserted": 0,
+            "inserted_ids": [],
             "skipped": len(duplicate_info_list),
             "last_obs_date": last_obs_date,
             "confirmed": False
@@ -219,7 +464,7 @@ def harmonize_and_insert(
         if duplicate_info_list:
             display_duplicates(duplicate_info_list, bank_name, account_name, last_obs_date)
         
-        print(f"Proceed with insertion of {len(new_transactions)} new transaction(s)? (y/n): ", end="")
+        print(f"Proceed with insertion of {new_count} new transaction(s)? (y/n): ", end="")
         try:
             user_input = input().strip().lower()
             if user_input in ['y', 'yes']:
@@ -233,46 +478,52 @@ def harmonize_and_insert(
             confirmed = False
     
     # Insert new transactions if confirmed
-    inserted_count = 0
+    inserted_ids: List[int] = []
     if confirmed:
         try:
-            for transaction in new_transactions:
-                try:
-                    db_transaction = Transaction(
-                        bank_name=transaction.bank_name,
-                        account_name=transaction.account_name,
-                        date=transaction.date,
-                        amount=transaction.amount,
-                        description=transaction.description,
-                        details=transaction.details,
-                        category=transaction.category,
-                        transaction_type=transaction.transaction_type,
-                        is_special=transaction.is_special
+            new_rows = (
+                select(*[staging_transactions.c[name] for name in STANDARDIZED_COLUMNS])
+                .where(~_staged_transaction_exists())
+                .order_by(staging_transactions.c.seq)
+            )
+            try:
+                # Single INSERT ... SELECT ... WHERE NOT EXISTS; RETURNING hands back the generated ids
+                with db.begin_nested():
+                    result = db.execute(
+                        insert(Transaction).from_select(STANDARDIZED_COLUMNS, new_rows).returning(Transaction.id)
                     )
-                    db.add(db_transaction)
-                    inserted_count += 1
-                except Exception as e:
-                    logger.error(f"Error inserting transaction {transaction.date} {transaction.description}: {e}")
-                    continue
-            
+                    inserted_ids = list(result.scalars())
+            except IntegrityError as e:
+                logger.warning(f"Bulk insert failed ({e}), retrying transaction by transaction")
+                for row in db.execute(new_rows).mappings().all():
+                    try:
+                        with db.begin_nested():
+                            inserted_ids.append(db.execute(insert(Transaction).returning(Transaction.id), dict(row)).scalar_one())
+                    except IntegrityError as row_error:
+                        logger.error(f"Error inserting transaction {row['date']} {row['description']}: {row_error}")
+                        continue
+            _clear_staging(db)
             db.commit()
-            logger.info(f"Successfully inserted {inserted_count} transactions")
+            
+            logger.info(f"Successfully inserted {len(inserted_ids)} transactions")
             
         except Exception as e:
             db.rollback()
             logger.error(f"Error during transaction insertion: {e}")
             raise
     else:
+        _clear_staging(db)
         logger.info("Skipping insertion (not confirmed or all duplicates)")
     
     logger.info(
         f"Harmonization complete - "
-        f"Inserted: {inserted_count} transactions, "
+        f"Inserted: {len(inserted_ids)} transactions, "
         f"Skipped: {len(duplicate_info_list)} duplicates"
     )
     
     return {
-        "inserted": inserted_count,
+        "inserted": len(inserted_ids),
+        "inserted_ids": inserted_ids,
         "skipped": len(duplicate_info_list),
         "last_obs_date": last_obs_date,
         "confirmed": confirmed
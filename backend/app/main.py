@@ -1,13 +1,14 @@
 """FastAPI application main file."""
 import logging
 import os
+from typing import Optional
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import Response
 
-from .database import engine, Base, apply_sqlite_light_migrations, backfill_investment_average_unit_costs
+from .database import create_missing_tables, apply_sqlite_light_migrations, backfill_investment_average_unit_costs
 
 # Configure logging
 logging.basicConfig(
@@ -17,8 +18,8 @@ logging.basicConfig(
 # Import models to register them with Base.metadata
 from . import models  # noqa: F401
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables (only on first boot or when new models were added)
+create_missing_tables()
 if apply_sqlite_light_migrations():
     backfill_investment_average_unit_costs()
 
@@ -69,39 +70,48 @@ def get_index_path():
     return os.path.join(frontend_path, "index.html")
 
 
+def _load_index_html() -> Optional[bytes]:
+    """Read index.html once at startup (None if the frontend is not available)."""
+    index_path = get_index_path()
+    if os.path.exists(index_path):
+        with open(index_path, "rb") as f:
+            return f.read()
+    return None
+
+
+# Served from memory: avoids a stat and a file open on every page request
+INDEX_HTML = _load_index_html()
+
+
 @app.get("/")
 async def root():
     """Root endpoint - serve index.html."""
-    index_path = get_index_path()
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+    if INDEX_HTML is not None:
+        return Response(INDEX_HTML, media_type="text/html")
     return {"message": "Personal Finance Tracker API", "version": "1.0.0"}
 
 
 @app.get("/upload")
 async def upload_page():
     """Serve index.html for Vue Router /upload route."""
-    index_path = get_index_path()
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+    if INDEX_HTML is not None:
+        return Response(INDEX_HTML, media_type="text/html")
     return {"error": "Page not found"}
 
 
 @app.get("/edit")
 async def edit_page():
     """Serve index.html for Vue Router /edit route."""
-    index_path = get_index_path()
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+    if INDEX_HTML is not None:
+        return Response(INDEX_HTML, media_type="text/html")
     return {"error": "Page not found"}
 
 
 @app.get("/investments")
 async def investments_page():
     """Serve index.html for Vue Router /investments route."""
-    index_path = get_index_path()
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+    if INDEX_HTML is not None:
+        return Response(INDEX_HTML, media_type="text/html")
     return {"error": "Page not found"}
 
 
@@ -136,4 +146,7 @@ app.include_router(raw_transactions.router, prefix="/api", tags=["raw-transactio
 app.include_router(investment_assets.router, prefix="/api/investment-assets", tags=["investment-assets"])
 app.include_router(investment_transactions.router, prefix="/api/investment-transactions", tags=["investment-transactions"])
 app.include_router(investment_market_quotes.router, prefix="/api/investment-portfolio-valuations", tags=["investment-portfolio-valuations"])
-app.include_router(investment_dashboard.router, prefix="/api/investment-dashboard", tags=["investment-dashboard"])
\ No newline at end of file
+app.include_router(investment_dashboard.router, prefix="/api/investment-dashboard", tags=["investment-dashboard"])
+
+# Preprocessing jobs run in this process: those left unfinished by the previous one never will be
+upload.fail_interrupted_preprocessing_jobs()
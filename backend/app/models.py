@@ -1,11 +1,70 @@
 """SQLAlchemy database models."""
-from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, Enum as SQLEnum, Index
+from sqlalchemy import Column, Integer, SmallInteger, String, Text, Float, Boolean, Date, DateTime, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.sql import func, text
 import enum
 from .database import Base
 
 
+class SmallIntEnum(TypeDecorator):
+    """
+    Store an enum as a SMALLINT code instead of its name (smaller rows and indexes, integer comparisons).
+
+    The code is the member's position in the enum definition, so new members must be appended at the end.
+    Members, names and values are accepted as parameters; unknown strings are passed through unchanged
+    (like SQLEnum without validation) and simply match no row.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class: type, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.enum_class = enum_class
+        # Lookup tables built once per column type, rather than walking the enum for every value
+        self._members = tuple(enum_class)
+        self._codes = {}
+        for code in reversed(range(len(self._members))):  # the first matching member wins
+            member = self._members[code]
+            self._codes[member.name] = code
+            self._codes[member.value] = code
+            self._codes[member] = code
+
+    def code_for(self, value):
+        """Return the code of an enum member, name or value, or None if it is not part of the enum."""
+        try:
+            return self._codes.get(value)
+        except TypeError:  # unhashable value
+            return None
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        code = self.code_for(value)
+        return value if code is None else code
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str) and not value.isdigit():
+            # Name stored before the column was converted to codes
+            return self.enum_class[value]
+        return self._members[int(value)]
+
+
+class EmptyIfNullString(TypeDecorator):
+    """String stored as '' instead of NULL, so that the column can be NOT NULL (and None never needs special-casing).
+    Read back as None, so that API responses keep returning null for a missing value."""
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return "" if value is None else value
+
+    def process_result_value(self, value, dialect):
+        return value or None
+
+
 class InvestmentType(str, enum.Enum):
     """Investment type enumeration."""
     ONE_TIME = "one_time"
@@ -78,8 +137,8 @@ class Account(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     bank_name = Column(String, nullable=False, index=True)
-    account_name = Column(String, nullable=False, index=True)
-    asset_type = Column(SQLEnum(AssetType), nullable=True, index=True)  # cash or investment
+    account_name = Column(String, nullable=False)  # indexed by idx_accounts_bank_account
+    asset_type = Column(SmallIntEnum(AssetType), nullable=True, index=True)  # cash or investment
     status = Column(Boolean, default=True, nullable=False)  # True=live, False=closed
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -96,17 +155,38 @@ class Transaction(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     bank_name = Column(String, nullable=False, index=True)
-    account_name = Column(String, nullable=False, index=True)
+    account_name = Column(String, nullable=False)  # indexed by idx_transactions_bank_account_date
     date = Column(Date, nullable=False, index=True)
     amount = Column(Float, nullable=False)
     description = Column(String)
     details = Column(String)
-    category = Column(String)
+    category = Column(EmptyIfNullString, nullable=False, default="", server_default="")
     transaction_type = Column(String)
     is_special = Column(Boolean, default=False)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    # Raw bank rows (one per transaction at most, transaction_id is unique). Lazy-loaded:
+    # list queries that read them must opt in with selectinload() to avoid one SELECT per row
+    intesa_raw_transaction = relationship("IntesaRawTransaction", back_populates="transaction", uselist=False)
+    allianz_raw_transaction = relationship("AllianzRawTransaction", back_populates="transaction", uselist=False)
+
+    # Composite index for per-account lookups (duplicate detection, last observation date)
+    __table_args__ = (
+        Index('idx_transactions_bank_account_date', 'bank_name', 'account_name', 'date'),
+        # Partial index: uncategorized rows ('') are left out, which keeps it small. SQLite only
+        # uses it when the query also has the condition category <> ''
+        Index(
+            'idx_transactions_category', 'category',
+            sqlite_where=text("category <> ''"), postgresql_where=text("category <> ''")
+        ),
+        # Same for the transaction types (rows without one, NULL or '', are left out)
+        Index(
+            'idx_transactions_transaction_type', 'transaction_type',
+            sqlite_where=text("transaction_type <> ''"), postgresql_where=text("transaction_type <> ''")
+        ),
+    )
+
 
 class IntesaRawTransaction(Base):
     """Raw Intesa transaction data before preprocessing."""
@@ -125,7 +205,7 @@ class IntesaRawTransaction(Base):
     created_at = Column(DateTime, default=func.now())
 
     # Relationship
-    transaction = relationship("Transaction", backref="intesa_raw_transaction", uselist=False)
+    transaction = relationship("Transaction", back_populates="intesa_raw_transaction")
 
 
 class AllianzRawTransaction(Base):
@@ -141,7 +221,7 @@ class AllianzRawTransaction(Base):
     created_at = Column(DateTime, default=func.now())
 
     # Relationship
-    transaction = relationship("Transaction", backref="allianz_raw_transaction", uselist=False)
+    transaction = relationship("Transaction", back_populates="allianz_raw_transaction")
 
 
 class InvestmentProduct(Base):
@@ -153,7 +233,7 @@ class InvestmentProduct(Base):
     bank_name = Column(String, nullable=False, index=True)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=True)
-    investment_type = Column(SQLEnum(InvestmentType), nullable=False)
+    investment_type = Column(SmallIntEnum(InvestmentType), nullable=False)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
@@ -183,7 +263,7 @@ class InvestmentObservation(Base):
     __tablename__ = "investment_observations"
 
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("investment_products.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("investment_products.id"), nullable=False)  # indexed by idx_investment_observations_product_date
     observation_date = Column(Date, nullable=False, index=True)
     num_shares = Column(Float, nullable=False)
     total_invested = Column(Float, nullable=False)
@@ -193,6 +273,11 @@ class InvestmentObservation(Base):
     # Relationships
     product = relationship("InvestmentProduct", back_populates="observations")
 
+    # Composite index for per-product lookups ordered/filtered by date
+    __table_args__ = (
+        Index('idx_investment_observations_product_date', 'product_id', 'observation_date'),
+    )
+
 
 class InvestmentWithdrawal(Base):
     """Investment withdrawal table."""
@@ -201,7 +286,7 @@ class InvestmentWithdrawal(Base):
     id = Column(Integer, primary_key=True, index=True)
     bank_name = Column(String, nullable=False, index=True)
     date = Column(Date, nullable=False, index=True)
-    type = Column(SQLEnum(WithdrawalType), nullable=False)
+    type = Column(SmallIntEnum(WithdrawalType), nullable=False)
     amount = Column(Float, nullable=False)
     description = Column(String)
     created_at = Column(DateTime, default=func.now())
@@ -214,7 +299,7 @@ class AssetsHistory(Base):
     id = Column(Integer, primary_key=True, index=True)
     account_name = Column(String, nullable=False, index=True)
     bank_name = Column(String, nullable=False, index=True)
-    asset_type = Column(SQLEnum(AssetType), nullable=False, index=True)
+    asset_type = Column(SmallIntEnum(AssetType), nullable=False, index=True)
     date = Column(Date, nullable=False, index=True)
     amount = Column(Float, nullable=False)
     created_at = Column(DateTime, default=func.now())
@@ -310,3 +395,15 @@ class InvestmentPortfolioMarketQuote(Base):
     __table_args__ = (
         Index("uq_inv_portfolio_market_quote_date_asset", "as_of_date", "asset_pk", unique=True),
     )
+
+
+class PreprocessingJob(Base):
+    """Upload preprocessing run in the background (POST /api/upload/preprocess/jobs)."""
+    __tablename__ = "preprocessing_jobs"
+
+    id = Column(String, primary_key=True)  # uuid4 hex
+    status = Column(String, nullable=False)  # queued, running, done or failed
+    result_json = Column(Text)  # PreprocessingResult as JSON, once done
+    error = Column(String)  # Error message, once failed
+    created_at = Column(DateTime, default=func.now(), index=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -5,15 +5,70 @@ This module provides functions to insert raw transaction data from banks
 before preprocessing, linking them to processed transactions.
 """
 import logging
-from typing import Optional, Dict, Any
+import re
+from typing import Optional, Dict, Any, Callable, List, Sequence, Tuple
 from datetime import date, datetime
 import pandas as pd
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from .models import IntesaRawTransaction, AllianzRawTransaction, Transaction
 
 logger = logging.getLogger(__name__)
 
+# Date formats tried by _normalize_date / _normalize_date_column, in order of priority
+_DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d.%m.%Y"]
+# Currency symbols removed from amount strings by _normalize_amount / _normalize_amount_column
+_CURRENCY_SYMBOLS_RE = re.compile(r"\$|€|£|₹|Rs|rs|EUR|eur")
+# Raw columns normalized once per DataFrame by insert_raw_transactions_from_dataframe
+_RAW_DATE_COLUMNS = ["data", "data contabile", "data valuta"]
+_RAW_AMOUNT_COLUMNS = ["importo"]
+# Bulk INSERT statements, built once so every upload reuses the same statement (and its cached compiled
+# form). As in bulk_insert_transactions: Core table inserts, which skip the ORM bulk persistence layer, and
+# no sort_by_parameter_order, which makes SQLite insert row by row
+_INTESA_RAW_INSERT = insert(IntesaRawTransaction.__table__).returning(IntesaRawTransaction.id)
+_ALLIANZ_RAW_INSERT = insert(AllianzRawTransaction.__table__).returning(AllianzRawTransaction.id)
+
+
+def _parse_fixed_width_date(text: str) -> Optional[date]:
+    """
+    Parse a zero-padded 10-character date without strptime (fast path of _normalize_date).
+    
+    Handles the _DATE_FORMATS layouts with the same priority (day before month for "/").
+    
+    Args:
+        text: Stripped date string
+        
+    Returns:
+        date object, or None if the string is not one of those layouts (or not a valid date)
+    """
+    if len(text) != 10:
+        return None
+    separator = text[4]
+    if separator in "-/" and text[7] == separator:
+        year, first, second = text[0:4], text[5:7], text[8:10]
+        if year.isdecimal() and first.isdecimal() and second.isdecimal():
+            candidates = [(int(year), int(first), int(second))]
+        else:
+            return None
+    else:
+        separator = text[2]
+        if separator not in "-/." or text[5] != separator:
+            return None
+        first, second, year = text[0:2], text[3:5], text[6:10]
+        if not (year.isdecimal() and first.isdecimal() and second.isdecimal()):
+            return None
+        candidates = [(int(year), int(second), int(first))]
+        if separator == "/":
+            candidates.append((int(year), int(first), int(second)))
+    for year_number, month, day in candidates:
+        if 1 <= month <= 12 and 1 <= day <= 31:
+            try:
+                return date(year_number, month, day)
+            except ValueError:
+                continue
+    return None
+
 
 def _normalize_date(date_value: Any) -> date:
     """
@@ -34,9 +89,20 @@ def _normalize_date(date_value: Any) -> date:
     
     # Try parsing as string
     if isinstance(date_value, str):
+        text = date_value.strip()
+        parsed = _parse_fixed_width_date(text)
+        if parsed is not None:
+            return parsed
+        # ISO datetimes, as sent back by the upload preview (raw dates serialized with isoformat()):
+        # none of _DATE_FORMATS matches them, and pandas would guess the format for every value
+        if len(text) > 10 and text[10] in "T ":
+            try:
+                return datetime.fromisoformat(text).date()
+            except ValueError:
+                pass
         try:
             # Try common date formats
-            for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d.%m.%Y"]:
+            for fmt in _DATE_FORMATS:
                 try:
                     return datetime.strptime(date_value.strip(), fmt).date()
                 except ValueError:
@@ -64,18 +130,22 @@ def _normalize_amount(amount_value: Any) -> float:
     Returns:
         float value
     """
+    # insert_raw_transactions_from_dataframe passes floats already normalized by _normalize_amount_column
+    # (as are most cells read from Excel): check them first, with NaN != NaN instead of a pd.isna call
+    if isinstance(amount_value, float):
+        if amount_value != amount_value:
+            raise ValueError("Amount value is NaN")
+        return float(amount_value)
+    
     if pd.isna(amount_value):
         raise ValueError("Amount value is NaN")
     
-    if isinstance(amount_value, (int, float)):
+    if isinstance(amount_value, int):
         return float(amount_value)
     
     if isinstance(amount_value, str):
         # Remove currency symbols, commas, spaces
-        cleaned = amount_value.strip().replace(",", ".").replace(" ", "")
-        # Remove common currency symbols
-        for symbol in ["$", "€", "£", "₹", "Rs", "rs", "EUR", "eur"]:
-            cleaned = cleaned.replace(symbol, "")
+        cleaned = _CURRENCY_SYMBOLS_RE.sub("", amount_value.strip().replace(",", ".").replace(" ", ""))
         
         try:
             return float(cleaned)
@@ -88,6 +158,151 @@ def _normalize_amount(amount_value: Any) -> float:
         raise ValueError(f"Could not convert to float: {amount_value} - {e}")
 
 
+def _normalize_date_column(values: pd.Series) -> pd.Series:
+    """
+    Vectorized _normalize_date for a whole column.
+    
+    Strings are parsed one format at a time over the whole column, each format only filling the
+    values not matched by a previous one (same priority as _normalize_date).
+    
+    Args:
+        values: Series of dates in various formats (string, datetime, date, etc.)
+        
+    Returns:
+        object Series of date objects, with None where the value is missing or cannot be parsed
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        dates = values
+    else:
+        is_text = values.map(type) == str
+        dates = pd.to_datetime(values.where(~is_text), errors="coerce")
+        if is_text.any():
+            text = values[is_text].str.strip()
+            parsed = pd.to_datetime(text, format=_DATE_FORMATS[0], errors="coerce", cache=True)
+            for fmt in _DATE_FORMATS[1:]:
+                missing = parsed.isna()
+                if not missing.any():
+                    break
+                parsed = parsed.fillna(pd.to_datetime(text[missing], format=fmt, errors="coerce", cache=True))
+            # Fallback to pandas parsing (values are parsed one by one, as their format is unknown)
+            missing = parsed.isna()
+            if missing.any():
+                parsed = parsed.fillna(text[missing].map(lambda value: pd.to_datetime(value, errors="coerce")))
+            dates = dates.fillna(parsed)
+    return dates.dt.date.astype(object).where(dates.notna(), None)
+
+
+def _normalize_amount_column(values: pd.Series) -> pd.Series:
+    """
+    Vectorized _normalize_amount for a whole column.
+    
+    Args:
+        values: Series of amounts in various formats (string, number, etc.)
+        
+    Returns:
+        float Series, with NaN where the value is missing or cannot be parsed
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    is_text = values.map(type) == str
+    amounts = pd.to_numeric(values.where(~is_text), errors="coerce")
+    if is_text.any():
+        # Decimal comma, spaces and currency symbols, as in _normalize_amount
+        cleaned = (
+            values[is_text].str.strip()
+            .str.replace(",", ".", regex=False)
+            .str.replace(" ", "", regex=False)
+            .str.replace(_CURRENCY_SYMBOLS_RE, "", regex=True)
+        )
+        amounts = amounts.fillna(pd.to_numeric(cleaned, errors="coerce"))
+    return amounts.astype(float)
+
+
+def _intesa_raw_values(raw_row: Dict[str, Any], transaction_id: int) -> Dict[str, Any]:
+    """
+    Normalize a raw Intesa row into IntesaRawTransaction column values.
+    
+    Args:
+        raw_row: Dictionary containing raw Intesa data (see insert_intesa_raw_transaction)
+        transaction_id: ID of the processed Transaction to link to
+        
+    Returns:
+        Dictionary of IntesaRawTransaction column values
+    """
+    # Normalize date
+    raw_date = _normalize_date(raw_row.get('data'))
+    
+    # Normalize amount
+    raw_amount = _normalize_amount(raw_row.get('importo'))
+    
+    return {
+        "transaction_id": transaction_id,
+        "data": raw_date,
+        "operazione": str(raw_row.get('operazione')).strip() or None,
+        "dettagli": str(raw_row.get('dettagli')).strip() or None,
+        "conto_o_carta": str(raw_row.get('conto o carta')).strip() or None,
+        "contabilizzazione": str(raw_row.get('contabilizzazione')).strip() or None,
+        "categoria": str(raw_row.get('categoria')).strip() or None,
+        "valuta": str(raw_row.get('valuta')).strip() or None,
+        "importo": raw_amount
+    }
+
+
+def _allianz_raw_values(raw_row: Dict[str, Any], transaction_id: int) -> Dict[str, Any]:
+    """
+    Normalize a raw Allianz row into AllianzRawTransaction column values.
+    
+    Args:
+        raw_row: Dictionary containing raw Allianz data (see insert_allianz_raw_transaction)
+        transaction_id: ID of the processed Transaction to link to
+        
+    Returns:
+        Dictionary of AllianzRawTransaction column values
+    """
+    # Normalize dates
+    data_contabile = _normalize_date(raw_row.get('data contabile'))
+    data_valuta = None
+    if raw_row.get('data valuta'):
+        try:
+            data_valuta = _normalize_date(raw_row.get('data valuta'))
+        except Exception:
+            data_valuta = None
+    
+    # Normalize amount - Allianz uses 'dare euro' and 'avere euro' which are combined
+    # But in raw data, we should store the original importo if available
+    # Otherwise calculate from dare/avere
+    if 'importo' in raw_row or 'Importo' in raw_row:
+        raw_amount = _normalize_amount(raw_row.get('importo'))
+    else:
+        raise ValueError("Could not determine importo from raw_row")
+    
+    return {
+        "transaction_id": transaction_id,
+        "data_contabile": data_contabile,
+        "data_valuta": data_valuta,
+        "descrizione": str(raw_row.get('descrizione')).strip() or None,
+        "importo": raw_amount
+    }
+
+
+def _raw_insert_for_bank(bank_name: str) -> Optional[Tuple[Any, Callable[[Dict[str, Any], int], Dict[str, Any]]]]:
+    """
+    Resolve the raw table of a bank.
+    
+    Args:
+        bank_name: Bank name ("intesa", "banca intesa" or "allianz", case-insensitive)
+        
+    Returns:
+        (bulk INSERT statement, row normalizer) for the bank's raw table, or None if the bank has none
+    """
+    bank_name_lower = bank_name.lower().strip()
+    if bank_name_lower in ("intesa", "banca intesa"):
+        return _INTESA_RAW_INSERT, _intesa_raw_values
+    if bank_name_lower == "allianz":
+        return _ALLIANZ_RAW_INSERT, _allianz_raw_values
+    return None
+
+
 def insert_intesa_raw_transaction(
     raw_row: Dict[str, Any],
     transaction_id: int,
@@ -112,23 +327,7 @@ def insert_intesa_raw_transaction(
     Returns:
         Created IntesaRawTransaction object
     """
-    # Normalize date
-    raw_date = _normalize_date(raw_row.get('data'))
-    
-    # Normalize amount
-    raw_amount = _normalize_amount(raw_row.get('importo'))
-    
-    raw_transaction = IntesaRawTransaction(
-        transaction_id=transaction_id,
-        data=raw_date,
-        operazione=str(raw_row.get('operazione')).strip() or None,
-        dettagli=str(raw_row.get('dettagli')).strip() or None,
-        conto_o_carta=str(raw_row.get('conto o carta')).strip() or None,
-        contabilizzazione=str(raw_row.get('contabilizzazione')).strip() or None,
-        categoria=str(raw_row.get('categoria')).strip() or None,
-        valuta=str(raw_row.get('valuta')).strip() or None,
-        importo=raw_amount
-    )
+    raw_transaction = IntesaRawTransaction(**_intesa_raw_values(raw_row, transaction_id))
     
     db.add(raw_transaction)
     return raw_transaction
@@ -154,66 +353,111 @@ def insert_allianz_raw_transaction(
     Returns:
         Created AllianzRawTransaction object
     """
-    # Normalize dates
-    data_contabile = _normalize_date(raw_row.get('data contabile'))
-    data_valuta = None
-    if raw_row.get('data valuta'):
-        try:
-            data_valuta = _normalize_date(raw_row.get('data valuta'))
-        except Exception:
-            data_valuta = None
-    
-    # Normalize amount - Allianz uses 'dare euro' and 'avere euro' which are combined
-    # But in raw data, we should store the original importo if available
-    # Otherwise calculate from dare/avere
-    if 'importo' in raw_row or 'Importo' in raw_row:
-        raw_amount = _normalize_amount(raw_row.get('importo'))
-    else:
-        raise ValueError("Could not determine importo from raw_row")
-    
-    raw_transaction = AllianzRawTransaction(
-        transaction_id=transaction_id,
-        data_contabile=data_contabile,
-        data_valuta=data_valuta,
-        descrizione=str(raw_row.get('descrizione')).strip() or None,
-        importo=raw_amount
-    )
+    raw_transaction = AllianzRawTransaction(**_allianz_raw_values(raw_row, transaction_id))
     
     db.add(raw_transaction)
     return raw_transaction
 
 
+def insert_raw_transactions(
+    raw_rows: Sequence[Tuple[str, Dict[str, Any], int]],
+    db: Session,
+    batch_size: int = 1000
+) -> int:
+    """
+    Insert raw transactions of any supported bank, with one executemany per raw table and batch.
+    
+    Rows of a bank without a raw table, or that cannot be normalized, are skipped with a warning.
+    Nothing is committed: the raw rows land in the caller's commit.
+    
+    Args:
+        raw_rows: (bank_name, raw_row, transaction_id) tuples, raw_row as accepted by
+            insert_intesa_raw_transaction / insert_allianz_raw_transaction
+        db: Database session
+        batch_size: Maximum number of rows sent per INSERT statement
+        
+    Returns:
+        Number of raw transactions inserted
+    """
+    # Raw table name -> (its INSERT statement, normalized rows to insert)
+    rows_by_table: Dict[str, Tuple[Any, List[Dict[str, Any]]]] = {}
+    for bank_name, raw_row, transaction_id in raw_rows:
+        raw_insert = _raw_insert_for_bank(bank_name)
+        if raw_insert is None:
+            logger.warning(f"No raw transaction handler for bank: {bank_name}")
+            continue
+        statement, raw_values = raw_insert
+        try:
+            row = raw_values(raw_row, transaction_id)
+        except Exception as e:
+            logger.warning(f"Failed to insert raw transaction for transaction {transaction_id}: {e}")
+            # Continue without raw data - don't fail the whole insert
+            continue
+        rows_by_table.setdefault(statement.table.name, (statement, []))[1].append(row)
+    
+    inserted_count = 0
+    for statement, rows in rows_by_table.values():
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            db.execute(statement, batch)
+            inserted_count += len(batch)
+    return inserted_count
+
+
 def insert_raw_transactions_from_dataframe(
     raw_df: pd.DataFrame,
     processed_transactions: list[Transaction],
     bank_name: str,
-    db: Session
-) -> list:
+    db: Session,
+    batch_size: int = 1000,
+    commit_every: Optional[int] = 5000
+) -> List[int]:
     """
     Insert raw transactions from a DataFrame, linking them to processed transactions.
     
     This function matches raw rows to processed transactions by index.
     It handles cases where some rows may have been filtered during preprocessing.
+    The rows are normalized first, then inserted with one executemany per batch
+    (no ORM objects are created), and committed once at the end, so that either all
+    of them are stored or none. The caller must not hold a transaction open across
+    this function unless commit_every is None: its pending changes are committed too.
     
     Args:
         raw_df: Raw DataFrame before preprocessing
         processed_transactions: List of Transaction objects that were created
         bank_name: Bank name ("intesa" or "Allianz")
         db: Database session
+        batch_size: Maximum number of rows sent per INSERT statement
+        commit_every: Flush the session after about this many rows, and commit once at the end;
+            None leaves committing to the caller (the raw rows then land in its commit)
         
     Returns:
-        List of created raw transaction objects
+        Ids of the created raw transactions
     """
-    created_raw_transactions = []
-    
-    # Normalize bank name for comparison
-    bank_name_lower = bank_name.lower().strip()
+    # Resolve the destination table once, not for every row
+    raw_insert = _raw_insert_for_bank(bank_name)
+    if raw_insert is None:
+        logger.warning(f"Unknown bank name: {bank_name}. Skipping raw transaction insertion.")
+        return []
+    statement, raw_values = raw_insert
+    rows: List[Dict[str, Any]] = []
     
     # Match by index - assumes preprocessing preserves order (except for filtered rows)
     # We'll match by trying to find corresponding rows
     processed_index = 0
     
-    for raw_idx, raw_row in raw_df.iterrows():
+    # Normalize the date and amount columns once for the whole DataFrame: the per-row helpers then only
+    # get date/float values, or None/NaN for invalid ones, which they reject as before
+    raw_df = raw_df.copy()
+    for column in _RAW_DATE_COLUMNS:
+        if column in raw_df.columns:
+            raw_df[column] = _normalize_date_column(raw_df[column])
+    for column in _RAW_AMOUNT_COLUMNS:
+        if column in raw_df.columns:
+            raw_df[column] = _normalize_amount_column(raw_df[column])
+    
+    columns = list(raw_df.columns)
+    for raw_idx, *values in raw_df.itertuples(index=True, name=None):
         # Skip if we've processed all transactions
         if processed_index >= len(processed_transactions):
             logger.warning(f"More raw rows than processed transactions. Skipping raw row {raw_idx}")
@@ -222,23 +466,7 @@ def insert_raw_transactions_from_dataframe(
         transaction = processed_transactions[processed_index]
         
         try:
-            if bank_name_lower == "intesa" or bank_name_lower == "banca intesa":
-                raw_trans = insert_intesa_raw_transaction(
-                    raw_row.to_dict(),
-                    transaction.id,
-                    db
-                )
-            elif bank_name_lower == "allianz":
-                raw_trans = insert_allianz_raw_transaction(
-                    raw_row.to_dict(),
-                    transaction.id,
-                    db
-                )
-            else:
-                logger.warning(f"Unknown bank name: {bank_name}. Skipping raw transaction insertion.")
-                continue
-            
-            created_raw_transactions.append(raw_trans)
+            rows.append(raw_values(dict(zip(columns, values)), transaction.id))
             processed_index += 1
             
         except Exception as e:
@@ -247,4 +475,16 @@ def insert_raw_transactions_from_dataframe(
             processed_index += 1
             continue
     
-    return created_raw_transactions
+    inserted_ids: List[int] = []
+    unflushed_count = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        inserted_ids.extend(sorted(db.execute(statement, batch).scalars()))
+        unflushed_count += len(batch)
+        if commit_every and unflushed_count >= commit_every:
+            # Push the session's pending changes without ending the transaction
+            db.flush()
+            unflushed_count = 0
+    if commit_every:
+        db.commit()
+    return inserted_ids
@@ -1,15 +1,18 @@
 """Account API endpoints."""
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, insert, literal, select, tuple_, update
 from typing import List, Optional
 from datetime import date
 from pydantic import BaseModel
 
-from ..database import get_db
-from ..models import Account, Transaction, AssetsHistory
+from ..database import get_db, insert_unless_exists
+from ..models import Account, AssetType, Transaction, AssetsHistory
 from ..schemas import Account as AccountSchema, AccountCreate, AccountUpdate, AssetTypeEnum
 
+# Response enum for each stored AssetType, so that responses built with model_construct() carry the schema enum
+_SCHEMA_ASSET_TYPES = {asset_type: AssetTypeEnum(asset_type.value) for asset_type in AssetType}
+
 
 class AccountWithLastDate(BaseModel):
     """Account with last transaction date."""
@@ -49,46 +52,85 @@ async def sync_accounts_from_assets_history(
         AssetsHistory.asset_type
     ).distinct().all()
     
+    # Load the existing accounts in a single query instead of one lookup per account
+    account_keys = {(bank_name, account_name) for bank_name, account_name, _ in assets_accounts}
+    existing_accounts = {}
+    if account_keys:
+        existing_accounts = {
+            (account.bank_name, account.account_name): account
+            for account in db.query(Account).filter(
+                tuple_(Account.bank_name, Account.account_name).in_(account_keys)
+            )
+        }
+    
     created_count = 0
     updated_count = 0
-    result_accounts = []
+    new_accounts = {}  # (bank_name, account_name) -> column values of the accounts to create
+    asset_type_updates = {}  # existing account id -> new asset_type
+    result_keys = []
     
     for bank_name, account_name, asset_type in assets_accounts:
-        # Check if account already exists
-        existing_account = db.query(Account).filter(
-            Account.bank_name == bank_name,
-            Account.account_name == account_name
-        ).first()
+        key = (bank_name, account_name)
+        existing_account = existing_accounts.get(key)
+        new_account = new_accounts.get(key)
         
         if existing_account:
             # Update asset_type if different
-            if existing_account.asset_type != asset_type:
-                existing_account.asset_type = asset_type
+            current_asset_type = asset_type_updates.get(existing_account.id, existing_account.asset_type)
+            if current_asset_type != asset_type:
+                asset_type_updates[existing_account.id] = asset_type
+                updated_count += 1
+        elif new_account:
+            # Account created earlier in this loop (same account, another asset_type)
+            if new_account["asset_type"] != asset_type:
+                new_account["asset_type"] = asset_type
                 updated_count += 1
-            result_accounts.append(existing_account)
         else:
             # Create new account
-            new_account = Account(
-                bank_name=bank_name,
-                account_name=account_name,
-                asset_type=asset_type,
-                status=True
-            )
-            db.add(new_account)
-            db.flush()
+            new_accounts[key] = {
+                "bank_name": bank_name,
+                "account_name": account_name,
+                "asset_type": asset_type,
+                "status": True
+            }
             created_count += 1
-            result_accounts.append(new_account)
+        result_keys.append(key)
     
-    db.commit()
+    result_by_key = dict(existing_accounts)
+    
+    # Apply all the asset_type changes with a single UPDATE ... SET asset_type = CASE id ... END,
+    # instead of an UPDATE per account on flush
+    if asset_type_updates:
+        asset_type_column = Account.__table__.c.asset_type
+        statement = (
+            update(Account)
+            .where(Account.id.in_(list(asset_type_updates)))
+            .values(asset_type=case(
+                {
+                    account_id: literal(new_asset_type, asset_type_column.type)
+                    for account_id, new_asset_type in asset_type_updates.items()
+                },
+                value=Account.id
+            ))
+            .returning(*Account.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        for row in db.execute(statement).mappings():
+            result_by_key[(row["bank_name"], row["account_name"])] = dict(row)
+    
+    # Insert the new accounts with one batched INSERT returning the stored rows, instead of an
+    # INSERT per account on flush
+    if new_accounts:
+        statement = insert(Account).returning(*Account.__table__.columns)
+        for row in db.execute(statement, list(new_accounts.values())).mappings():
+            result_by_key[(row["bank_name"], row["account_name"])] = dict(row)
     
-    # Refresh all accounts
-    for account in result_accounts:
-        db.refresh(account)
+    db.commit()
     
     return SyncAccountsResult(
         created_count=created_count,
         updated_count=updated_count,
-        accounts=result_accounts
+        accounts=[result_by_key[key] for key in result_keys]
     )
 
 
@@ -123,30 +165,45 @@ async def get_accounts_with_last_transaction_dates(
     - active_only: If True (default), only return active accounts (status=True)
     - asset_type: Filter by asset type ('cash' or 'investment')
     """
-    # Build query for accounts
-    query = db.query(Account)
+    # Last transaction date of each account, as a correlated subquery so that the accounts and their
+    # dates come back in a single statement (each max() is an index seek on idx_transactions_bank_account_date)
+    last_date = (
+        select(func.max(Transaction.date))
+        .where(
+            Transaction.bank_name == Account.bank_name,
+            Transaction.account_name == Account.account_name
+        )
+        .correlate(Account)
+        .scalar_subquery()
+    )
+    
+    # Build query for accounts (plain columns: no ORM Account instance is needed to build the response)
+    query = db.query(
+        Account.id,
+        Account.bank_name,
+        Account.account_name,
+        Account.asset_type,
+        Account.status,
+        last_date
+    )
     if active_only:
         query = query.filter(Account.status == True)
     if asset_type:
         query = query.filter(Account.asset_type == asset_type)
     
-    accounts = query.order_by(Account.bank_name, Account.account_name).all()
+    rows = query.order_by(Account.bank_name, Account.account_name).all()
     
-    # Get last transaction date for each account
+    # The values come from our own tables: skip validating each of them (the response is still validated
+    # once against response_model)
     result = []
-    for account in accounts:
-        last_date = db.query(func.max(Transaction.date)).filter(
-            Transaction.bank_name == account.bank_name,
-            Transaction.account_name == account.account_name
-        ).scalar()
-        
-        result.append(AccountWithLastDate(
-            id=account.id,
-            bank_name=account.bank_name,
-            account_name=account.account_name,
-            asset_type=account.asset_type,
-            status=account.status,
-            last_transaction_date=last_date
+    for account_id, bank_name, account_name, account_asset_type, status, last_transaction_date in rows:
+        result.append(AccountWithLastDate.model_construct(
+            id=account_id,
+            bank_name=bank_name,
+            account_name=account_name,
+            asset_type=_SCHEMA_ASSET_TYPES.get(account_asset_type),
+            status=status,
+            last_transaction_date=last_transaction_date
         ))
     
     return result
@@ -170,18 +227,11 @@ async def create_account(
     db: Session = Depends(get_db),
 ):
     """Create a new account."""
-    # Check if account already exists
-    existing_account = db.query(Account).filter(
-        Account.bank_name == account.bank_name,
-        Account.account_name == account.account_name
-    ).first()
-    if existing_account:
+    # The unique (bank_name, account_name) index checks whether the account already exists
+    db_account = insert_unless_exists(db, Account, account.model_dump(), ["bank_name", "account_name"])
+    if db_account is None:
         raise HTTPException(status_code=400, detail="Account already exists")
-    
-    db_account = Account(**account.dict())
-    db.add(db_account)
     db.commit()
-    db.refresh(db_account)
     return db_account
 
 
@@ -197,10 +247,9 @@ async def update_account(
         raise HTTPException(status_code=404, detail="Account not found")
     
     # Update only provided fields
-    update_data = account_update.dict(exclude_unset=True)
+    update_data = account_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_account, field, value)
     
     db.commit()
-    db.refresh(db_account)
     return db_account
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
-from ..database import get_db
+from ..database import get_db, insert_unless_exists
 from .. import models, schemas
 
 router = APIRouter()
@@ -21,20 +21,16 @@ def create_asset_type(
     db: Session = Depends(get_db)
 ):
     """Create a new asset type."""
-    # Check if asset type with same name already exists
-    existing = db.query(models.AssetTypeRef).filter(
-        models.AssetTypeRef.name == asset_type.name.lower()
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Asset type with this name already exists")
-    
-    db_asset_type = models.AssetTypeRef(
-        name=asset_type.name.lower(),
-        display_name=asset_type.display_name
+    # The unique name index checks whether an asset type with the same name already exists
+    db_asset_type = insert_unless_exists(
+        db,
+        models.AssetTypeRef,
+        {"name": asset_type.name.lower(), "display_name": asset_type.display_name},
+        ["name"]
     )
-    db.add(db_asset_type)
+    if db_asset_type is None:
+        raise HTTPException(status_code=400, detail="Asset type with this name already exists")
     db.commit()
-    db.refresh(db_asset_type)
     return db_asset_type
 
 
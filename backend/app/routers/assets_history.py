@@ -1,5 +1,6 @@
 """Assets History API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
@@ -31,9 +32,17 @@ async def get_assets_history(
     asset_type: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    after_id: Optional[int] = Query(None, ge=0),
     db: Session = Depends(get_db),
 ):
-    """Get all assets history entries, optionally filtered."""
+    """
+    Get all assets history entries, optionally filtered.
+    
+    - limit / after_id: keyset pagination. When either is given, entries are returned in id order,
+      starting after `after_id`; pass the id of the last entry received to get the next page
+      (a page shorter than `limit` is the last one). Without them, all entries are returned by date.
+    """
     query = db.query(AssetsHistory)
     
     if bank_name:
@@ -51,8 +60,16 @@ async def get_assets_history(
     if end_date:
         query = query.filter(AssetsHistory.date <= end_date)
     
-    assets = query.order_by(AssetsHistory.date, AssetsHistory.bank_name, AssetsHistory.account_name).all()
-    return assets
+    if limit is None and after_id is None:
+        return query.order_by(AssetsHistory.date, AssetsHistory.bank_name, AssetsHistory.account_name).all()
+    
+    # Keyset pagination: each page is a primary key range scan, whatever its position
+    if after_id is not None:
+        query = query.filter(AssetsHistory.id > after_id)
+    query = query.order_by(AssetsHistory.id)
+    if limit:
+        query = query.limit(limit)
+    return query.all()
 
 
 @router.get("/{asset_id}", response_model=AssetsHistorySchema)
@@ -73,10 +90,9 @@ async def create_asset_history(
     db: Session = Depends(get_db),
 ):
     """Create a new assets history entry."""
-    db_asset = AssetsHistory(**asset.dict())
-    db.add(db_asset)
+    # Core INSERT ... RETURNING the new row as an AssetsHistory (no unit-of-work flush)
+    db_asset = db.execute(insert(AssetsHistory).values(**asset.model_dump()).returning(AssetsHistory)).scalar_one()
     db.commit()
-    db.refresh(db_asset)
     return db_asset
 
 
@@ -93,20 +109,16 @@ async def create_bulk_asset_history(
     if not request.entries:
         return BulkAssetsHistoryResult(created_count=0, entries=[])
     
-    created_entries = []
     try:
-        for entry in request.entries:
-            db_asset = AssetsHistory(**entry.dict())
-            db.add(db_asset)
-            db.flush()  # Flush to get the ID
-            created_entries.append(db_asset)
+        # One batched INSERT returning the stored rows (ids, timestamps), instead of a flush per entry
+        # and a refresh per entry after the commit. sort_by_parameter_order would make SQLite fall back
+        # to one statement per row: ids are assigned in input order, so sorting by id restores it
+        statement = insert(AssetsHistory).returning(*AssetsHistory.__table__.columns)
+        rows = db.execute(statement, [entry.model_dump() for entry in request.entries]).mappings()
+        created_entries = sorted((dict(row) for row in rows), key=lambda row: row["id"])
         
         db.commit()
         
-        # Refresh all entries to get updated data
-        for entry in created_entries:
-            db.refresh(entry)
-        
         return BulkAssetsHistoryResult(
             created_count=len(created_entries),
             entries=created_entries
@@ -128,12 +140,11 @@ async def update_asset_history(
         raise HTTPException(status_code=404, detail="Assets history entry not found")
     
     # Update only provided fields
-    update_data = asset_update.dict(exclude_unset=True)
+    update_data = asset_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_asset, field, value)
     
     db.commit()
-    db.refresh(db_asset)
     return db_asset
 
 
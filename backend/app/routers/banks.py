@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
-from ..database import get_db
+from ..database import get_db, insert_unless_exists
 from ..models import Bank
 from ..schemas import Bank as BankSchema, BankCreate
 
@@ -37,13 +37,9 @@ async def create_bank(
     db: Session = Depends(get_db),
 ):
     """Create a new bank."""
-    # Check if bank with same name already exists
-    existing_bank = db.query(Bank).filter(Bank.name == bank.name).first()
-    if existing_bank:
+    # The unique name index checks whether a bank with the same name already exists
+    db_bank = insert_unless_exists(db, Bank, bank.model_dump(), ["name"])
+    if db_bank is None:
         raise HTTPException(status_code=400, detail="Bank with this name already exists")
-    
-    db_bank = Bank(**bank.dict())
-    db.add(db_bank)
     db.commit()
-    db.refresh(db_bank)
     return db_bank
@@ -101,7 +101,6 @@ def create_asset(body: InvestmentPortfolioAssetCreate, db: Session = Depends(get
     )
     db.add(row)
     db.commit()
-    db.refresh(row)
     return row
 
 
@@ -177,7 +176,6 @@ def update_asset(asset_pk: int, body: InvestmentPortfolioAssetUpdate, db: Sessio
     )
 
     db.commit()
-    db.refresh(row)
     return row
 
 
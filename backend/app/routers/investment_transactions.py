@@ -48,7 +48,6 @@ def _insert_investment_transaction(db: Session, body: InvestmentPortfolioTransac
     )
     db.add(row)
     db.commit()
-    db.refresh(row)
     return row
 
 
@@ -79,7 +78,6 @@ def create_transaction(body: InvestmentPortfolioTransactionCreate, db: Session =
     row = _insert_investment_transaction(db, body)
     recalculate_average_unit_costs_for_asset(db, body.asset_pk)
     db.commit()
-    db.refresh(row)
     return row
 
 
@@ -123,10 +121,8 @@ def update_transaction(tx_id: int, body: InvestmentPortfolioTransactionUpdate, d
             )
 
     db.commit()
-    db.refresh(row)
     recalculate_average_unit_costs_for_asset(db, row.asset_pk)
     db.commit()
-    db.refresh(row)
     return row
 
 
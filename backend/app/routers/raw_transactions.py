@@ -1,6 +1,8 @@
 """Raw transactions router for viewing bank-specific raw data."""
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
+from typing import List
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ..database import get_db
@@ -10,6 +12,47 @@ from ..schemas import AllianzRawTransaction as AllianzRawTransactionSchema
 
 router = APIRouter(prefix="/raw-transactions", tags=["Raw Transactions"])
 
+_intesa_list_adapter = TypeAdapter(List[IntesaRawTransactionSchema])
+_allianz_list_adapter = TypeAdapter(List[AllianzRawTransactionSchema])
+
+
+def _json_list_response(adapter: TypeAdapter, statement, db: Session) -> Response:
+    """
+    Run a SELECT of plain columns and return its rows as a JSON array response.
+    
+    The rows are validated against the list's schema and written to JSON by pydantic-core in one
+    call: no ORM instances, and no intermediate dicts for json.dumps (the body is the same as with
+    response_model).
+    
+    Args:
+        adapter: TypeAdapter of the response list
+        statement: SELECT of the table columns
+        db: Database session
+        
+    Returns:
+        application/json response
+    """
+    rows = db.execute(statement).mappings().all()
+    return Response(content=adapter.dump_json(adapter.validate_python(rows)), media_type="application/json")
+
+
+def _count_rows(db: Session, model: type) -> int:
+    """
+    Count the rows of a raw transactions table.
+    
+    count(id) straight on the table, rather than Query.count() wrapping a SELECT of every column: the
+    database answers it from the smallest index, and the count is always current (it is polled by the
+    frontend right after uploads).
+    
+    Args:
+        db: Database session
+        model: IntesaRawTransaction or AllianzRawTransaction
+        
+    Returns:
+        Number of rows in the model's table
+    """
+    return db.execute(select(func.count(model.id))).scalar_one()
+
 
 @router.get("/intesa", response_model=List[IntesaRawTransactionSchema])
 def get_intesa_raw_transactions(
@@ -18,8 +61,8 @@ def get_intesa_raw_transactions(
     db: Session = Depends(get_db)
 ):
     """Get all Intesa raw transactions."""
-    query = db.query(IntesaRawTransaction).order_by(IntesaRawTransaction.data.desc())
-    return query.offset(skip).limit(limit).all()
+    statement = select(*IntesaRawTransaction.__table__.columns).order_by(IntesaRawTransaction.data.desc())
+    return _json_list_response(_intesa_list_adapter, statement.offset(skip).limit(limit), db)
 
 
 @router.get("/allianz", response_model=List[AllianzRawTransactionSchema])
@@ -29,17 +72,17 @@ def get_allianz_raw_transactions(
     db: Session = Depends(get_db)
 ):
     """Get all Allianz raw transactions."""
-    query = db.query(AllianzRawTransaction).order_by(AllianzRawTransaction.data_contabile.desc())
-    return query.offset(skip).limit(limit).all()
+    statement = select(*AllianzRawTransaction.__table__.columns).order_by(AllianzRawTransaction.data_contabile.desc())
+    return _json_list_response(_allianz_list_adapter, statement.offset(skip).limit(limit), db)
 
 
 @router.get("/intesa/count")
 def get_intesa_count(db: Session = Depends(get_db)):
     """Get count of Intesa raw transactions."""
-    return {"count": db.query(IntesaRawTransaction).count()}
+    return {"count": _count_rows(db, IntesaRawTransaction)}
 
 
 @router.get("/allianz/count")
 def get_allianz_count(db: Session = Depends(get_db)):
     """Get count of Allianz raw transactions."""
-    return {"count": db.query(AllianzRawTransaction).count()}
+    return {"count": _count_rows(db, AllianzRawTransaction)}
@@ -1,68 +1,192 @@
 """Transaction API endpoints."""
+import itertools
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import RowMapping, func, insert, select, tuple_
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Iterator, Optional, List, Sequence
 from datetime import date
 
-from ..database import get_db
+from ..database import ReadSessionLocal, get_db
 from ..models import Transaction
 from ..schemas import Transaction as TransactionSchema, TransactionCreate, TransactionUpdate
 
 router = APIRouter()
 
+# Rows fetched from the cursor, validated and serialized at a time when listing transactions
+STREAM_BATCH_SIZE = 1000
+_transaction_list_adapter = TypeAdapter(List[TransactionSchema])
+
+
+def _stream_transactions_json(db: Session, first_batch: Sequence[RowMapping], batches: Iterator[Sequence[RowMapping]]) -> Iterator[bytes]:
+    """
+    Serialize transactions as a JSON array, one batch of rows at a time.
+    
+    Each batch is validated against the Transaction schema and written to JSON by pydantic-core
+    (the same body as response_model=List[Transaction], without building intermediate dicts for
+    json.dumps); only one batch is ever held in memory.
+    
+    Args:
+        db: Session the rows are read from, closed once the array is complete
+        first_batch: First batch of rows, already fetched by _open_transactions_stream
+        batches: Remaining batches of rows
+        
+    Yields:
+        Pieces of the JSON array
+    """
+    try:
+        yield b"["
+        separator = b""
+        for rows in itertools.chain([first_batch], batches):
+            if not rows:
+                continue
+            batch = _transaction_list_adapter.dump_json(_transaction_list_adapter.validate_python(rows))
+            yield separator + batch[1:-1]
+            separator = b","
+        yield b"]"
+    finally:
+        db.close()
+
+
+def _open_transactions_stream(statement) -> Iterator[bytes]:
+    """
+    Run a SELECT of the transactions table columns and return the stream of its JSON array.
+    
+    The stream reads from its own session: a streamed body is sent after the request's dependency
+    cleanup has run, so it cannot use the session from get_db. The statement is executed, and its
+    first batch fetched, before any byte is sent, so that a database error is still reported with
+    an error status instead of a 200 with a truncated array.
+    
+    Args:
+        statement: SELECT of the transactions table columns
+        
+    Returns:
+        Iterator over the pieces of the JSON array (see _stream_transactions_json)
+    """
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE)).mappings()
+        batches = result.partitions()
+        first_batch = next(batches, [])
+    except Exception:
+        db.close()
+        raise
+    return _stream_transactions_json(db, first_batch, batches)
 
-@router.get("/", response_model=List[TransactionSchema])
+
+# Streamed body: the array is documented through responses= (response_model would not apply to it)
+@router.get("/", responses={200: {"model": List[TransactionSchema]}})
 async def get_transactions(
     skip: int = Query(0, ge=0),
     limit: Optional[int] = Query(None, ge=1),
     bank_name: Optional[str] = None,
     account_name: Optional[str] = None,
+    category: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    db: Session = Depends(get_db),
+    before_date: Optional[date] = None,
+    before_id: Optional[int] = Query(None, ge=1),
 ):
-    """Get all transactions with optional filtering."""
-    query = db.query(Transaction)
+    """
+    Get all transactions with optional filtering.
+    
+    Transactions are returned by date descending, then id descending.
+    
+    - before_date / before_id: keyset pagination cursor, given together. Only transactions after
+      (date, id) in that order are returned: pass the date and id of the last transaction received,
+      with the same filters and limit, to get the next page (a page shorter than `limit` is the last
+      one). Unlike `skip`, the cost of a page does not grow with its position.
+    
+    The JSON array is streamed in batches of STREAM_BATCH_SIZE rows straight from the database
+    cursor, so memory use does not grow with the number of transactions returned.
+    """
+    if (before_date is None) != (before_id is None):
+        raise HTTPException(status_code=400, detail="before_date and before_id must be given together")
+    
+    # Plain columns: the rows are serialized directly, without ORM Transaction instances
+    statement = select(*Transaction.__table__.columns)
     
     # Apply filters
     if bank_name:
-        query = query.filter(Transaction.bank_name == bank_name)
+        statement = statement.where(Transaction.bank_name == bank_name)
     if account_name:
-        query = query.filter(Transaction.account_name == account_name)
+        statement = statement.where(Transaction.account_name == account_name)
+    if category:
+        # Repeat the partial index condition so that SQLite can use idx_transactions_category
+        statement = statement.where(Transaction.category == category, Transaction.category != "")
     if start_date:
         try:
             start = date.fromisoformat(start_date)
-            query = query.filter(Transaction.date >= start)
+            statement = statement.where(Transaction.date >= start)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid start_date format. Use YYYY-MM-DD")
     if end_date:
         try:
             end = date.fromisoformat(end_date)
-            query = query.filter(Transaction.date <= end)
+            statement = statement.where(Transaction.date <= end)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid end_date format. Use YYYY-MM-DD")
     
-    # Order by date descending
-    query = query.order_by(Transaction.date.desc())
+    if before_date is not None:
+        # Row value comparison: a range seek on the date indexes, which end with the id (rowid)
+        statement = statement.where(tuple_(Transaction.date, Transaction.id) < tuple_(before_date, before_id))
+    
+    # Order by date descending (id as tie-breaker, so that pages are stable)
+    statement = statement.order_by(Transaction.date.desc(), Transaction.id.desc())
     
-    # Apply pagination (if limit is provided)
+    # Apply pagination (if limit is provided; otherwise fetch all, with offset)
+    statement = statement.offset(skip)
     if limit:
-        transactions = query.offset(skip).limit(limit).all()
-    else:
-        # If no limit, fetch all (with offset)
-        transactions = query.offset(skip).all()
+        statement = statement.limit(limit)
     
-    return transactions
+    stream = await run_in_threadpool(_open_transactions_stream, statement)
+    return StreamingResponse(stream, media_type="application/json")
 
 
 @router.get("/types", response_model=List[str])
 async def get_transaction_types(db: Session = Depends(get_db)):
     """Get all distinct transaction types."""
-    result = db.query(Transaction.transaction_type).distinct().filter(
-        Transaction.transaction_type.isnot(None),
-        Transaction.transaction_type != ""
-    ).order_by(Transaction.transaction_type).all()
-    return [r[0] for r in result]
+    # Loose index scan instead of SELECT DISTINCT over the whole table: a recursive CTE jumps from each
+    # type to the next one with a min() seek on idx_transactions_transaction_type, so the cost grows
+    # with the number of distinct types, not of transactions. Types come out in ascending order.
+    # The partial index condition (transaction_type <> '', which also excludes NULL) is repeated in
+    # both steps so that SQLite can use the index
+    types = (
+        select(func.min(Transaction.transaction_type).label("transaction_type"))
+        .where(Transaction.transaction_type != "")
+        .cte("types", recursive=True)
+    )
+    next_type = (
+        select(func.min(Transaction.transaction_type))
+        .where(Transaction.transaction_type != "", Transaction.transaction_type > types.c.transaction_type)
+        .scalar_subquery()
+    )
+    types = types.union_all(select(next_type).where(types.c.transaction_type.isnot(None)))
+    result = db.execute(select(types.c.transaction_type).where(types.c.transaction_type.isnot(None)))
+    return result.scalars().all()
+
+
+def _get_transaction_or_404(db: Session, transaction_id: int) -> Transaction:
+    """
+    Load a transaction by primary key, or raise a 404.
+
+    Session.get() checks the identity map first and otherwise issues a primary key SELECT, with no
+    Query object to build and no LIMIT.
+
+    Args:
+        db: Database session
+        transaction_id: Id of the transaction
+
+    Returns:
+        The Transaction
+    """
+    transaction = db.get(Transaction, transaction_id)
+    if transaction is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return transaction
 
 
 @router.get("/{transaction_id}", response_model=TransactionSchema)
@@ -71,10 +195,7 @@ async def get_transaction(
     db: Session = Depends(get_db),
 ):
     """Get a single transaction by ID."""
-    transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
-    if not transaction:
-        raise HTTPException(status_code=404, detail="Transaction not found")
-    return transaction
+    return _get_transaction_or_404(db, transaction_id)
 
 
 @router.post("/", response_model=TransactionSchema, status_code=201)
@@ -83,10 +204,11 @@ async def create_transaction(
     db: Session = Depends(get_db),
 ):
     """Create a new transaction."""
-    db_transaction = Transaction(**transaction.dict())
-    db.add(db_transaction)
+    # Core INSERT ... RETURNING the new row as a Transaction (no unit-of-work flush)
+    db_transaction = db.execute(
+        insert(Transaction).values(**transaction.model_dump()).returning(Transaction)
+    ).scalar_one()
     db.commit()
-    db.refresh(db_transaction)
     return db_transaction
 
 
@@ -97,17 +219,14 @@ async def update_transaction(
     db: Session = Depends(get_db),
 ):
     """Update an existing transaction."""
-    db_transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
-    if not db_transaction:
-        raise HTTPException(status_code=404, detail="Transaction not found")
+    db_transaction = _get_transaction_or_404(db, transaction_id)
     
     # Update only provided fields
-    update_data = transaction_update.dict(exclude_unset=True)
+    update_data = transaction_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_transaction, field, value)
     
     db.commit()
-    db.refresh(db_transaction)
     return db_transaction
 
 
@@ -117,9 +236,7 @@ async def delete_transaction(
     db: Session = Depends(get_db),
 ):
     """Delete a transaction."""
-    db_transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
-    if not db_transaction:
-        raise HTTPException(status_code=404, detail="Transaction not found")
+    db_transaction = _get_transaction_or_404(db, transaction_id)
     
     db.delete(db_transaction)
     db.commit()
@@ -1,23 +1,29 @@
 """Upload API endpoints for transaction file processing."""
+import functools
+import os
 import shutil
 import logging
+import uuid
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from datetime import date
-from typing import List, Optional, Any, Dict
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from datetime import date, datetime, timedelta, timezone
+from typing import BinaryIO, Callable, List, Optional, Any, Dict, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, insert, update
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
-from ..database import get_db
-from ..models import Transaction
+from ..database import SessionLocal, get_db, get_read_db, relax_commit_durability
+from ..file_reader import FileSource
+from ..models import PreprocessingJob
 from ..transactions_preprocessing import (
     TransactionsFileParser,
-    get_transactions_parser_registry,
-    StandardizedTransaction
+    get_transactions_parser_registry
 )
-from ..harmonization import detect_duplicates
-from ..raw_transactions import insert_intesa_raw_transaction, insert_allianz_raw_transaction
+from ..harmonization import bulk_insert_transactions, detect_duplicates
+from ..raw_transactions import insert_raw_transactions
 
 # Import parsers to register them
 from ..transactions_preprocessing_intesa import IntesaParser
@@ -37,6 +43,10 @@ register_transactions_parser(FinecoBankParser())
 # Data directory for storing raw files
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
+# Size of the chunks an upload is written to disk in, so that a large file is never held in memory whole
+UPLOAD_CHUNK_SIZE = 1 << 20
+# How long preprocessing jobs (and their results) are kept; expired jobs are deleted when a new one is created
+PREPROCESSING_JOB_TTL = timedelta(days=1)
 
 
 # Pydantic models for request/response
@@ -69,6 +79,17 @@ class PreprocessingResult(BaseModel):
     saved_filename: str
 
 
+_preprocessing_result_adapter = TypeAdapter(PreprocessingResult)
+
+
+class PreprocessingJobInfo(BaseModel):
+    """Preprocessing job run in the background."""
+    job_id: str
+    status: str  # 'queued', 'running', 'done', 'failed'
+    result: Optional[PreprocessingResult] = None  # Set once done
+    error: Optional[str] = None  # Set once failed
+
+
 class HarmonizationResult(BaseModel):
     """Result from harmonization step."""
     new_transactions: List[ParsedTransaction]
@@ -100,25 +121,102 @@ class CommitResult(BaseModel):
     message: str
 
 
-@router.post("/preprocess", response_model=PreprocessingResult)
-async def preprocess_file(
-    file: UploadFile = File(...),
-    bank_name: str = Form(...),
-    account_name: str = Form(...),
-    db: Session = Depends(get_db)
-):
+def _json_safe_value(val: Any) -> Any:
+    """Convert a pandas/numpy cell value to a Python type for JSON serialization."""
+    if hasattr(val, 'isoformat'):  # date/datetime
+        return val.isoformat()
+    if hasattr(val, 'item'):  # numpy types
+        return val.item()
+    if pd.isna(val):
+        return None
+    return val
+
+
+def _json_safe_values(column: pd.Series) -> List[Any]:
     """
-    Preprocess an uploaded transaction file.
+    Convert a whole column to Python values for JSON serialization.
+
+    Same result as _json_safe_value on each cell, with the per-cell checks
+    skipped for the columns whose dtype already tells the type of every value.
+
+    Args:
+        column: Column of the raw DataFrame
+
+    Returns:
+        List of JSON-serializable values, in row order
+    """
+    if pd.api.types.is_datetime64_any_dtype(column.dtype):
+        datetimes = column.to_numpy()
+        # Naive whole-second values (dates read from a statement): numpy formats them like
+        # Timestamp.isoformat() in a single C pass, without building a Timestamp per cell
+        if (
+            datetimes.dtype.kind == 'M'
+            and not np.isnat(datetimes).any()
+            and not (datetimes - datetimes.astype('datetime64[s]')).any()
+        ):
+            return np.datetime_as_string(datetimes, unit='s').tolist()
+        return [val.isoformat() for val in column.tolist()]
+    values = column.tolist()
+    if pd.api.types.is_float_dtype(column.dtype):
+        return [None if val != val else val for val in values]  # NaN is the only value != itself
+    if pd.api.types.is_integer_dtype(column.dtype) or pd.api.types.is_bool_dtype(column.dtype):
+        return values
+    # Object columns hold text for the most part: pass strings through without the per-cell checks
+    return [val if type(val) is str else _json_safe_value(val) for val in values]
+
+
+def _parse_uploaded_file(upload: BinaryIO, filename: str, bank_name: str) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+    """
+    Parse an uploaded file.
     
-    - Parses the file using the appropriate bank parser
-    - Returns parsed transactions with warnings
-    - Saves the raw file with standardized naming
+    Each upload gets its own TransactionsFileParser, which keeps the raw DataFrame of the file it
+    parsed, so concurrent uploads never see each other's raw rows.
+    
+    Args:
+        upload: Content of the upload
+        filename: Name of the uploaded file
+        bank_name: Bank name selecting the parser
+        
+    Returns:
+        Tuple of (standardized transactions DataFrame, raw DataFrame of the same file or None)
+    """
+    file_parser = TransactionsFileParser()
+    df = file_parser.parse_file(upload, bank_name=bank_name, filename=filename)
+    return df, file_parser.get_raw_dataframe()
+
+
+def _save_upload(upload: BinaryIO, file_path: Path) -> None:
+    """
+    Write the content of an upload to disk, in UPLOAD_CHUNK_SIZE chunks.
+    
+    Args:
+        upload: Content of the upload
+        file_path: Destination, overwritten if it exists
+    """
+    upload.seek(0)
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(upload, buffer, UPLOAD_CHUNK_SIZE)
+
+
+def _validate_upload(filename: Optional[str], bank_name: str) -> str:
+    """
+    Check that an upload can be preprocessed, before reading it.
+    
+    Args:
+        filename: Name of the uploaded file
+        bank_name: Bank name selecting the parser
+        
+    Returns:
+        Lowercase file extension
+        
+    Raises:
+        HTTPException: 400 if the file type is not supported or no parser is registered for the bank
     """
     # Validate file extension
-    if not file.filename:
+    if not filename:
         raise HTTPException(status_code=400, detail="No filename provided")
     
-    file_ext = Path(file.filename).suffix.lower()
+    file_ext = Path(filename).suffix.lower()
     if file_ext not in ['.xlsx', '.xls', '.csv']:
         raise HTTPException(
             status_code=400, 
@@ -133,136 +231,333 @@ async def preprocess_file(
             status_code=400, 
             detail=f"No parser registered for bank: {bank_name}. Available: intesa, allianz"
         )
+    return file_ext
+
+
+def _preprocess_upload(
+    upload: FileSource,
+    filename: str,
+    file_ext: str,
+    bank_name: str,
+    account_name: str,
+    save_file: Callable[[Path], None]
+) -> PreprocessingResult:
+    """
+    Parse an upload into transactions and save the raw file under its standardized name.
     
-    # Save uploaded file temporarily
-    temp_path = DATA_DIR / f"temp_{file.filename}"
-    try:
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        warnings: List[UploadWarning] = []
-        
-        # Parse the file
-        file_parser = TransactionsFileParser()
-        
-        # Parse file
-        try:
-            df = file_parser.parse_file(temp_path, bank_name=bank_name)
-            # Get raw DataFrame for storing raw data
-            raw_df = file_parser.get_raw_dataframe()
-        except Exception as e:
-            warnings.append(UploadWarning(
-                type="parsing_error",
-                message=f"Error parsing file: {str(e)}",
-                details={"error": str(e)}
-            ))
-            raise HTTPException(status_code=400, detail=f"Error parsing file: {str(e)}")
-        
-        if df.empty:
-            raise HTTPException(status_code=400, detail="No transactions found in file")
-        
-        # Add account_name to transactions
-        df['account_name'] = account_name
-        
-        # Check for duplicates within the file
-        duplicate_mask = df.duplicated(subset=['date', 'amount', 'description'], keep=False)
-        if duplicate_mask.any():
-            dup_count = duplicate_mask.sum()
-            warnings.append(UploadWarning(
-                type="duplicate",
-                message=f"Found {dup_count} duplicate transactions within the file",
-                details={"count": int(dup_count)}
-            ))
-        
-        # Get date range
-        first_date = df['date'].min()
-        last_date = df['date'].max()
-        
-        # Format dates for filename
-        first_date_str = first_date.strftime('%Y_%m_%d') if hasattr(first_date, 'strftime') else str(first_date).replace('-', '_')
-        last_date_str = last_date.strftime('%Y_%m_%d') if hasattr(last_date, 'strftime') else str(last_date).replace('-', '_')
-        
-        # Generate standardized filename
-        safe_bank = bank_name.lower().replace(' ', '_')
-        safe_account = account_name.lower().replace(' ', '_')
-        new_filename = f"{safe_bank}_{safe_account}_from_{first_date_str}_to_{last_date_str}{file_ext}"
-        final_path = DATA_DIR / new_filename
-        
-        # Move temp file to final location (overwrite if exists)
-        if final_path.exists():
-            final_path.unlink()
-        shutil.move(str(temp_path), str(final_path))
-        
-        # Convert to list of ParsedTransaction with raw data
-        transactions = []
-        
-        # Build a lookup for raw data by index
-        raw_data_lookup = {}
-        if raw_df is not None:
-            for idx, raw_row in raw_df.iterrows():
-                raw_row_dict = {}
-                for col in raw_df.columns:
-                    val = raw_row[col]
-                    # Convert pandas types to Python types for JSON serialization
-                    if hasattr(val, 'isoformat'):  # date/datetime
-                        raw_row_dict[col] = val.isoformat()
-                    elif hasattr(val, 'item'):  # numpy types
-                        raw_row_dict[col] = val.item()
-                    elif pd.isna(val):
-                        raw_row_dict[col] = None
-                    else:
-                        raw_row_dict[col] = val
-                raw_data_lookup[idx] = raw_row_dict
+    CPU-bound (pandas parsing, building the transactions): run it in the threadpool or in a background
+    task, never on the event loop.
+    
+    Args:
+        upload: Content of the upload, or path to a copy of it
+        filename: Name of the uploaded file
+        file_ext: Lowercase file extension, from _validate_upload
+        bank_name: Bank name selecting the parser
+        account_name: Account the transactions belong to
+        save_file: Called with the standardized path of the raw file, to write it there
         
-        for _, row in df.iterrows():
-            trans_date = row['date']
-            if hasattr(trans_date, 'date'):
-                trans_date = trans_date.date()
-            elif hasattr(trans_date, 'strftime'):
-                pass  # already a date
-            
-            # Get raw data for this transaction using _raw_idx preserved by the parser
-            raw_idx = row.get('_raw_idx')
-            raw_data = raw_data_lookup.get(raw_idx) if raw_idx is not None and raw_df is not None else None
-            
-            transactions.append(ParsedTransaction(
-                bank_name=str(row['bank_name']),
-                account_name=account_name,
-                date=trans_date,
-                amount=float(row['amount']),
-                description=str(row['description']) if row.get('description') else None,
-                details=str(row['details']) if row.get('details') else None,
-                category=str(row['category']) if row.get('category') else None,
-                transaction_type=str(row['transaction_type']) if row.get('transaction_type') else None,
-                is_special=bool(row.get('is_special', False)),
-                raw_data=raw_data
-            ))
+    Returns:
+        PreprocessingResult
         
-        return PreprocessingResult(
-            transactions=transactions,
-            warnings=warnings,
-            date_range={
-                "first_date": str(first_date),
-                "last_date": str(last_date)
-            },
-            saved_filename=new_filename
+    Raises:
+        HTTPException: 400 if the file cannot be parsed or holds no transactions
+    """
+    warnings: List[UploadWarning] = []
+    
+    # Parse file, and get the raw DataFrame for storing raw data
+    try:
+        df, raw_df = _parse_uploaded_file(upload, filename, bank_name)
+    except Exception as e:
+        warnings.append(UploadWarning(
+            type="parsing_error",
+            message=f"Error parsing file: {str(e)}",
+            details={"error": str(e)}
+        ))
+        raise HTTPException(status_code=400, detail=f"Error parsing file: {str(e)}")
+    
+    if df.empty:
+        raise HTTPException(status_code=400, detail="No transactions found in file")
+    
+    # Add account_name to transactions
+    df['account_name'] = account_name
+    
+    # Check for duplicates within the file
+    dup_count = int(df.duplicated(subset=['date', 'amount', 'description'], keep=False).sum())
+    if dup_count:
+        warnings.append(UploadWarning(
+            type="duplicate",
+            message=f"Found {dup_count} duplicate transactions within the file",
+            details={"count": dup_count}
+        ))
+    
+    # Get date range
+    first_date = df['date'].min()
+    last_date = df['date'].max()
+    
+    # Format dates for filename
+    first_date_str = first_date.strftime('%Y_%m_%d') if hasattr(first_date, 'strftime') else str(first_date).replace('-', '_')
+    last_date_str = last_date.strftime('%Y_%m_%d') if hasattr(last_date, 'strftime') else str(last_date).replace('-', '_')
+    
+    # Generate standardized filename
+    safe_bank = bank_name.lower().replace(' ', '_')
+    safe_account = account_name.lower().replace(' ', '_')
+    new_filename = f"{safe_bank}_{safe_account}_from_{first_date_str}_to_{last_date_str}{file_ext}"
+    final_path = DATA_DIR / new_filename
+    
+    # Save the raw file (overwrite if exists)
+    save_file(final_path)
+    
+    # Build a lookup for raw data by index, converting each column at once
+    raw_data_lookup = {}
+    if raw_df is not None:
+        raw_columns = list(raw_df.columns)
+        raw_values = [_json_safe_values(raw_df[col]) for col in raw_columns]
+        raw_data_lookup = {
+            idx: dict(zip(raw_columns, row))
+            for idx, row in zip(raw_df.index, zip(*raw_values))
+        }
+    
+    # Optional columns a parser may leave out, with the value used for every row in that case
+    for col, default in (
+        ('description', None), ('details', None), ('category', None),
+        ('transaction_type', None), ('is_special', False), ('_raw_idx', None)
+    ):
+        if col not in df.columns:
+            df[col] = default
+    
+    # Normalize each field column-wise, then zip the columns into transactions
+    bank_names = [str(value) for value in df['bank_name'].tolist()]
+    dates = df['date']
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        dates = dates.dt.date
+    dates = [value.date() if hasattr(value, 'date') else value for value in dates.tolist()]
+    amounts = df['amount'].astype(float).tolist()
+    text_columns = [
+        [str(value) if value else None for value in df[col].tolist()]
+        for col in ('description', 'details', 'category', 'transaction_type')
+    ]
+    special_flags = [bool(value) for value in df['is_special'].tolist()]
+    # Get raw data for each transaction using _raw_idx preserved by the parser
+    if raw_df is not None:
+        raw_rows = [
+            raw_data_lookup.get(raw_idx) if raw_idx is not None else None
+            for raw_idx in df['_raw_idx'].tolist()
+        ]
+    else:
+        raw_rows = [None] * len(df)
+    
+    # Every value already has its field type: skip validating each transaction. Nothing validates them
+    # later either (preprocess_file returns a raw Response, which bypasses response_model, and jobs
+    # store model_dump_json), so the conversions above must keep producing the field types
+    transactions = [
+        ParsedTransaction.model_construct(
+            bank_name=bank_name_value,
+            account_name=account_name,
+            date=trans_date,
+            amount=amount,
+            description=description,
+            details=details,
+            category=category,
+            transaction_type=transaction_type,
+            is_special=is_special,
+            raw_data=raw_data
         )
-        
+        for (
+            bank_name_value, trans_date, amount, description, details,
+            category, transaction_type, is_special, raw_data
+        ) in zip(bank_names, dates, amounts, *text_columns, special_flags, raw_rows)
+    ]
+    
+    return PreprocessingResult(
+        transactions=transactions,
+        warnings=warnings,
+        date_range={
+            "first_date": str(first_date),
+            "last_date": str(last_date)
+        },
+        saved_filename=new_filename
+    )
+
+
+@router.post("/preprocess", response_model=PreprocessingResult)
+async def preprocess_file(
+    file: UploadFile = File(...),
+    bank_name: str = Form(...),
+    account_name: str = Form(...)
+):
+    """
+    Preprocess an uploaded transaction file.
+    
+    - Parses the file using the appropriate bank parser
+    - Returns parsed transactions with warnings
+    - Saves the raw file with standardized naming
+    """
+    file_ext = _validate_upload(file.filename, bank_name)
+    
+    try:
+        # Parse the upload where the server spooled it (in memory up to 1 MB, a temporary file above),
+        # rather than copying it to disk first: the file is written only once, after it parsed. The
+        # whole preprocessing is CPU-bound: run it in the threadpool rather than on the event loop
+        result = await run_in_threadpool(
+            _preprocess_upload, file.file, file.filename, file_ext, bank_name, account_name,
+            functools.partial(_save_upload, file.file)
+        )
+        # A large statement makes a response of several MB: write it to JSON with pydantic-core in one
+        # call, in the threadpool as well, rather than through dicts and json.dumps on the event loop
+        # (the body is the same as with response_model, which now only documents it)
+        content = await run_in_threadpool(_preprocessing_result_adapter.dump_json, result)
+        return Response(content=content, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error in preprocess: {e}")
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+
+def _update_preprocessing_job(job_id: str, **values: Any) -> None:
+    """Set columns of a preprocessing job, in a session of its own (jobs run outside any request)."""
+    db = SessionLocal()
+    try:
+        db.execute(update(PreprocessingJob).where(PreprocessingJob.id == job_id).values(**values))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _queue_preprocessing_job(db: Session, job_id: str) -> None:
+    """
+    Store a new queued preprocessing job, deleting the jobs older than PREPROCESSING_JOB_TTL.
+    
+    Args:
+        db: Database session
+        job_id: Id of the new job
+    """
+    expired_before = datetime.now(timezone.utc).replace(tzinfo=None) - PREPROCESSING_JOB_TTL
+    db.execute(delete(PreprocessingJob).where(PreprocessingJob.created_at < expired_before))
+    db.execute(insert(PreprocessingJob).values(id=job_id, status="queued"))
+    db.commit()
+
+
+def fail_interrupted_preprocessing_jobs() -> None:
+    """
+    Mark the jobs left queued or running by a previous server process as failed, and delete their uploads.
+    
+    Jobs run as background tasks of the process that created them, so after a restart nothing would
+    ever finish them. Call once at startup, before any job is created.
+    """
+    db = SessionLocal()
+    try:
+        job_ids = db.execute(
+            update(PreprocessingJob)
+            .where(PreprocessingJob.status.in_(("queued", "running")))
+            .values(status="failed", error="Interrupted by a server restart, upload the file again")
+            .returning(PreprocessingJob.id)
+        ).scalars().all()
+        db.commit()
     finally:
-        # Clean up temp file if it still exists
-        if temp_path.exists():
-            temp_path.unlink()
+        db.close()
+    
+    for job_id in job_ids:
+        # Copies saved by create_preprocessing_job
+        for upload_path in DATA_DIR.glob(f"temp_{job_id}_*"):
+            upload_path.unlink(missing_ok=True)
+    if job_ids:
+        logger.warning(f"Marked {len(job_ids)} interrupted preprocessing job(s) as failed")
+
+
+def _run_preprocessing_job(
+    job_id: str,
+    upload_path: Path,
+    filename: str,
+    file_ext: str,
+    bank_name: str,
+    account_name: str
+) -> None:
+    """
+    Preprocess an upload queued by create_preprocessing_job, and store the result (or error) in its job.
+    
+    Args:
+        job_id: Id of the job
+        upload_path: Copy of the upload, moved to its standardized name once parsed (deleted otherwise)
+        filename: Name of the uploaded file
+        file_ext: Lowercase file extension, from _validate_upload
+        bank_name: Bank name selecting the parser
+        account_name: Account the transactions belong to
+    """
+    _update_preprocessing_job(job_id, status="running")
+    try:
+        result = _preprocess_upload(
+            upload_path, filename, file_ext, bank_name, account_name,
+            functools.partial(os.replace, upload_path)
+        )
+        _update_preprocessing_job(job_id, status="done", result_json=result.model_dump_json())
+    except HTTPException as e:
+        _update_preprocessing_job(job_id, status="failed", error=e.detail)
+    except Exception as e:
+        logger.error(f"Error in preprocessing job {job_id}: {e}")
+        _update_preprocessing_job(job_id, status="failed", error=f"Internal error: {str(e)}")
+    finally:
+        upload_path.unlink(missing_ok=True)
+
+
+@router.post("/preprocess/jobs", response_model=PreprocessingJobInfo, status_code=202)
+async def create_preprocessing_job(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    bank_name: str = Form(...),
+    account_name: str = Form(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Preprocess an uploaded transaction file in the background.
+    
+    - Same processing as /preprocess, but returns as soon as the file is received
+    - Poll GET /preprocess/jobs/{job_id} for the PreprocessingResult (or error)
+    - Jobs are kept for PREPROCESSING_JOB_TTL
+    """
+    file_ext = _validate_upload(file.filename, bank_name)
+    
+    # The upload is closed once the response is sent: keep a copy of it for the job
+    job_id = uuid.uuid4().hex
+    upload_path = DATA_DIR / f"temp_{job_id}_{file.filename}"
+    await run_in_threadpool(_save_upload, file.file, upload_path)
+    
+    # The write waits for the database lock while another upload commits: run it in the threadpool
+    # rather than on the event loop
+    try:
+        await run_in_threadpool(_queue_preprocessing_job, db, job_id)
+    except Exception:
+        upload_path.unlink(missing_ok=True)
+        raise
+    
+    # Runs in the threadpool after the response is sent
+    background_tasks.add_task(
+        _run_preprocessing_job, job_id, upload_path, file.filename, file_ext, bank_name, account_name
+    )
+    return PreprocessingJobInfo(job_id=job_id, status="queued")
+
+
+@router.get("/preprocess/jobs/{job_id}", response_model=PreprocessingJobInfo)
+async def get_preprocessing_job(
+    job_id: str,
+    db: Session = Depends(get_db)
+):
+    """Get the status of a preprocessing job, with its result once done."""
+    job = db.get(PreprocessingJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Preprocessing job not found")
+    return PreprocessingJobInfo(
+        job_id=job.id,
+        status=job.status,
+        result=PreprocessingResult.model_validate_json(job.result_json) if job.result_json else None,
+        error=job.error
+    )
 
 
 @router.post("/harmonize", response_model=HarmonizationResult)
 async def harmonize_transactions(
     transactions: List[ParsedTransaction],
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Harmonize parsed transactions against existing database.
@@ -276,55 +571,14 @@ async def harmonize_transactions(
             duplicate_transactions=[]
         )
     
-    # Build a lookup for raw_data using a composite key
-    # Key: (bank_name, account_name, date_str, amount, description)
-    raw_data_lookup = {}
-    for t in transactions:
-        key = (t.bank_name, t.account_name, str(t.date), t.amount, t.description)
-        raw_data_lookup[key] = t.raw_data
-    
-    # Convert to StandardizedTransaction objects for detect_duplicates
-    standardized = []
-    for t in transactions:
-        standardized.append(StandardizedTransaction(
-            bank_name=t.bank_name,
-            account_name=t.account_name,
-            date=t.date,
-            amount=t.amount,
-            description=t.description,
-            details=t.details,
-            category=t.category,
-            transaction_type=t.transaction_type,
-            is_special=t.is_special
-        ))
-    
-    # Detect duplicates
-    new_transactions_std, duplicate_info_list = detect_duplicates(db, standardized)
+    # ParsedTransaction has the attributes detect_duplicates reads: the new transactions come back
+    # as the request's own objects, raw_data included, with no intermediate copies. The lookup is
+    # pandas work and a database read: run it in the threadpool rather than on the event loop
+    new_transactions, duplicate_info_list = await run_in_threadpool(detect_duplicates, db, transactions)
     
-    # Convert back to ParsedTransaction, preserving raw_data
-    new_transactions = []
-    for t in new_transactions_std:
-        # Look up raw_data using composite key
-        key = (t.bank_name, t.account_name, str(t.date), t.amount, t.description)
-        raw_data = raw_data_lookup.get(key)
-        
-        new_transactions.append(ParsedTransaction(
-            bank_name=t.bank_name,
-            account_name=t.account_name,
-            date=t.date,
-            amount=t.amount,
-            description=t.description,
-            details=t.details,
-            category=t.category,
-            transaction_type=t.transaction_type,
-            is_special=t.is_special,
-            raw_data=raw_data
-        ))
-    
-    # Convert duplicates info to ParsedTransaction
-    duplicate_transactions = []
-    for d in duplicate_info_list:
-        duplicate_transactions.append(ParsedTransaction(
+    # Convert duplicates info to ParsedTransaction (values taken from already validated transactions)
+    duplicate_transactions = [
+        ParsedTransaction.model_construct(
             bank_name=d['bank_name'],
             account_name=d['account_name'],
             date=d['date'],
@@ -334,7 +588,9 @@ async def harmonize_transactions(
             category=d.get('category'),
             transaction_type=d.get('transaction_type'),
             is_special=False
-        ))
+        )
+        for d in duplicate_info_list
+    ]
     
     return HarmonizationResult(
         new_transactions=new_transactions,
@@ -342,6 +598,41 @@ async def harmonize_transactions(
     )
 
 
+def _insert_transactions(db: Session, transactions: List[ParsedTransaction]) -> Tuple[int, int]:
+    """
+    Insert transactions and their raw data, and commit.
+    
+    Args:
+        db: Database session
+        transactions: Reviewed transactions to insert
+        
+    Returns:
+        Tuple of (inserted transactions count, inserted raw transactions count)
+    """
+    # The whole upload is committed at once below, after the user reviewed it: skip waiting for
+    # the WAL flush on commit
+    relax_commit_durability(db)
+    
+    # Insert the main transactions with batched executemany statements instead of an ORM object
+    # and a flush per transaction; their ids come back in input order
+    transaction_ids = bulk_insert_transactions(
+        db, [t.model_dump(exclude={'raw_data'}) for t in transactions]
+    )
+    
+    # Insert raw transaction data if available, linked through the returned ids
+    raw_inserted_count = insert_raw_transactions(
+        [
+            (t.bank_name, t.raw_data, transaction_id)
+            for t, transaction_id in zip(transactions, transaction_ids)
+            if t.raw_data
+        ],
+        db
+    )
+    
+    db.commit()
+    return len(transaction_ids), raw_inserted_count
+
+
 @router.post("/commit", response_model=CommitResult)
 async def commit_transactions(
     request: CommitRequest,
@@ -359,43 +650,12 @@ async def commit_transactions(
             message="No transactions to commit"
         )
     
-    inserted_count = 0
-    raw_inserted_count = 0
     try:
-        for t in request.transactions:
-            # Insert the main transaction
-            db_transaction = Transaction(
-                bank_name=t.bank_name,
-                account_name=t.account_name,
-                date=t.date,
-                amount=t.amount,
-                description=t.description,
-                details=t.details,
-                category=t.category,
-                transaction_type=t.transaction_type,
-                is_special=t.is_special
-            )
-            db.add(db_transaction)
-            db.flush()  # Flush to get the transaction ID
-            inserted_count += 1
-            
-            # Insert raw transaction data if available
-            if t.raw_data:
-                bank_name_lower = t.bank_name.lower().strip()
-                try:
-                    if bank_name_lower == "intesa" or bank_name_lower == "banca intesa":
-                        insert_intesa_raw_transaction(t.raw_data, db_transaction.id, db)
-                        raw_inserted_count += 1
-                    elif bank_name_lower == "allianz":
-                        insert_allianz_raw_transaction(t.raw_data, db_transaction.id, db)
-                        raw_inserted_count += 1
-                    else:
-                        logger.warning(f"No raw transaction handler for bank: {t.bank_name}")
-                except Exception as raw_err:
-                    logger.warning(f"Failed to insert raw transaction for transaction {db_transaction.id}: {raw_err}")
-                    # Continue without raw data - don't fail the whole commit
-        
-        db.commit()
+        # Waiting for the write lock and inserting thousands of rows block: run them in the threadpool
+        # rather than on the event loop, so that the other requests are served meanwhile
+        inserted_count, raw_inserted_count = await run_in_threadpool(
+            _insert_transactions, db, request.transactions
+        )
         
         message = f"Successfully committed {inserted_count} transactions"
         if raw_inserted_count > 0:
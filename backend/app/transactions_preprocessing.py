@@ -1,19 +1,40 @@
 """File parsing and standardization with bank-specific preprocessing."""
 import pandas as pd
-from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, FrozenSet, Optional, Any
 from datetime import date, datetime
 from abc import ABC, abstractmethod
+import copy
 import logging
+import re
 
-from .file_reader import FileReader
+from .file_reader import FileReader, FileSource
 
 logger = logging.getLogger(__name__)
 
+# Separators and currency symbols removed from amount strings (one C-level pass with str.translate)
+_AMOUNT_TRANSLATION = str.maketrans("", "", ",$€£₹ \t")
+_RUPEE_PATTERN = re.compile(r"[Rr]s")
+
+# Date formats tried by normalize_date / normalize_date_column, in order of priority
+_DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d"]
+
+
+# Standardized transaction fields, in StandardizedTransaction constructor order
+STANDARDIZED_COLUMNS = [
+    "bank_name", "account_name", "date", "amount", "description",
+    "details", "category", "transaction_type", "is_special"
+]
+
 
 class StandardizedTransaction:
     """Standardized transaction data structure."""
     
+    # No per-instance __dict__: large statements create one object per row
+    __slots__ = (
+        "bank_name", "account_name", "date", "amount", "description",
+        "details", "category", "transaction_type", "is_special"
+    )
+    
     def __init__(
         self,
         bank_name: str,
@@ -51,6 +72,43 @@ class StandardizedTransaction:
         }
 
 
+def normalize_transactions_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerce a DataFrame of standardized transactions to the types stored in the database.
+    
+    Vectorized counterpart of dataframe_to_list: dates and amounts are parsed once per column,
+    missing amounts become 0.0 and rows with an unparseable date or amount are dropped.
+    
+    Args:
+        df: DataFrame with columns date, amount and optionally bank_name, account_name,
+            description, details, category, transaction_type, is_special
+            
+    Returns:
+        DataFrame with the STANDARDIZED_COLUMNS, using None for missing values
+    """
+    dates = pd.to_datetime(df['date'], format='ISO8601', cache=True, errors='coerce')
+    amounts = pd.to_numeric(df['amount'], errors='coerce')
+    valid = dates.notna() & (amounts.notna() | df['amount'].isna())
+    if not valid.all():
+        logger.warning(f"Skipping {int((~valid).sum())} rows with an invalid date or amount")
+    
+    normalized = pd.DataFrame(index=df.index[valid])
+    for column in ['bank_name', 'account_name', 'description', 'details', 'category', 'transaction_type']:
+        if column in df.columns:
+            values = df.loc[valid, column]
+            normalized[column] = values.astype(str).where(values.notna(), None)
+        else:
+            normalized[column] = None
+    normalized['date'] = dates[valid].dt.date
+    normalized['amount'] = amounts[valid].fillna(0.0)
+    if 'is_special' in df.columns:
+        values = df.loc[valid, 'is_special']
+        normalized['is_special'] = values.where(values.notna(), False).astype(bool)
+    else:
+        normalized['is_special'] = False
+    return normalized[STANDARDIZED_COLUMNS]
+
+
 def dataframe_to_list(df: pd.DataFrame) -> List[StandardizedTransaction]:
     """
     Convert a DataFrame with standardized transaction columns to a list of StandardizedTransaction objects.
@@ -62,37 +120,12 @@ def dataframe_to_list(df: pd.DataFrame) -> List[StandardizedTransaction]:
     Returns:
         List of StandardizedTransaction objects
     """
-    transactions = []
-    
-    for _, row in df.iterrows():
-        try:
-            # Extract date - handle both date and datetime types
-            trans_date = row['date']
-            if isinstance(trans_date, pd.Timestamp):
-                trans_date = trans_date.date()
-            elif isinstance(trans_date, datetime):
-                trans_date = trans_date.date()
-            elif not isinstance(trans_date, date):
-                # Try to parse if it's a string
-                trans_date = pd.to_datetime(trans_date).date()
-            
-            transaction = StandardizedTransaction(
-                bank_name=str(row['bank_name']) if pd.notna(row.get('bank_name')) else None,
-                account_name=str(row['account_name']) if pd.notna(row.get('account_name')) else None,
-                date=trans_date,
-                amount=float(row['amount']) if pd.notna(row.get('amount')) else 0.0,
-                description=str(row['description']) if pd.notna(row.get('description')) else None,
-                details=str(row['details']) if pd.notna(row.get('details')) else None,
-                category=str(row['category']) if pd.notna(row.get('category')) else None,
-                transaction_type=str(row['transaction_type']) if pd.notna(row.get('transaction_type')) else None,
-                is_special=bool(row['is_special']) if pd.notna(row.get('is_special')) else False
-            )
-            transactions.append(transaction)
-        except Exception as e:
-            logger.warning(f"Skipping row due to error in dataframe_to_list: {e}")
-            continue
-    
-    return transactions
+    # Normalize column by column, then build the objects from the columns in a single zip
+    normalized = normalize_transactions_dataframe(df)
+    return [
+        StandardizedTransaction(*values)
+        for values in zip(*(normalized[column] for column in STANDARDIZED_COLUMNS))
+    ]
 
 
 class BankTransactionsParser(ABC):
@@ -107,19 +140,32 @@ class BankTransactionsParser(ABC):
         pass
     
     @abstractmethod
-    def can_parse(self, df: pd.DataFrame, filename: Optional[str] = None) -> bool:
+    def can_parse(
+        self,
+        df: pd.DataFrame,
+        filename: Optional[str] = None,
+        *,
+        columns_lower: Optional[FrozenSet[str]] = None
+    ) -> bool:
         """
         Check if this parser can handle the given DataFrame.
         
         Args:
             df: The DataFrame to check
             filename: Optional filename for additional context
+            columns_lower: Lowercased, stripped column names of df (see lowercase_columns),
+                computed once by the caller when several parsers are tried on the same file
             
         Returns:
             True if this parser can handle the file, False otherwise
         """
         pass
     
+    @staticmethod
+    def lowercase_columns(df: pd.DataFrame) -> FrozenSet[str]:
+        """Return the set of lowercased, stripped column names of a DataFrame."""
+        return frozenset(str(column).lower().strip() for column in df.columns)
+    
     @abstractmethod
     def parse(self, df: pd.DataFrame, filename: Optional[str] = None) -> pd.DataFrame:
         """
@@ -163,7 +209,7 @@ class BankTransactionsParser(ABC):
         if isinstance(date_value, str):
             try:
                 # Try common date formats
-                for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%Y/%m/%d"]:
+                for fmt in _DATE_FORMATS:
                     try:
                         return datetime.strptime(date_value.strip(), fmt).date()
                     except ValueError:
@@ -171,8 +217,8 @@ class BankTransactionsParser(ABC):
                 # Fallback to pandas parsing
                 return pd.to_datetime(date_value).date()
             except Exception as e:
-                logger.warning(f"Could not parse date '{date_value}': {e}")
-                raise ValueError(f"Invalid date format: {date_value}")
+                # No log here: this runs once per row, callers report the rows they skip
+                raise ValueError(f"Invalid date format: {date_value} - {e}")
         
         # Try pandas conversion
         try:
@@ -180,6 +226,39 @@ class BankTransactionsParser(ABC):
         except Exception as e:
             raise ValueError(f"Could not convert to date: {date_value} - {e}")
     
+    def normalize_date_column(self, dates: pd.Series) -> pd.Series:
+        """
+        Vectorized normalize_date for a whole column.
+        
+        Each format is parsed once over the whole column and only fills the values not matched by
+        a previous format, so every value gets the same format priority as in normalize_date.
+        
+        Args:
+            dates: Series of dates in various formats (string, datetime, date, etc.)
+            
+        Returns:
+            datetime64 Series, with NaT where the value is missing or cannot be parsed
+        """
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            return dates
+        values = dates
+        if pd.api.types.is_object_dtype(dates) or pd.api.types.is_string_dtype(dates):
+            stripped = dates.str.strip()
+            values = stripped.where(stripped.notna(), dates)
+        
+        parsed = pd.to_datetime(values, format=_DATE_FORMATS[0], errors="coerce", cache=True)
+        for fmt in _DATE_FORMATS[1:]:
+            missing = parsed.isna() & values.notna()
+            if not missing.any():
+                return parsed
+            parsed = parsed.fillna(pd.to_datetime(values[missing], format=fmt, errors="coerce", cache=True))
+        
+        # Fallback to pandas parsing (values are parsed one by one, as their format is unknown)
+        missing = parsed.isna() & values.notna()
+        if missing.any():
+            parsed = parsed.fillna(values[missing].map(lambda value: pd.to_datetime(value, errors="coerce")))
+        return parsed
+    
     def normalize_amount(self, amount_value: Any) -> float:
         """
         Normalize various amount formats to float.
@@ -190,18 +269,24 @@ class BankTransactionsParser(ABC):
         Returns:
             float value
         """
+        # Most cells read from Excel are already floats (np.float64 included): check them first,
+        # with NaN != NaN instead of a pd.isna call
+        if isinstance(amount_value, float):
+            if amount_value != amount_value:
+                raise ValueError("Amount value is NaN")
+            return float(amount_value)
+
         if pd.isna(amount_value):
             raise ValueError("Amount value is NaN")
-        
-        if isinstance(amount_value, (int, float)):
+
+        if isinstance(amount_value, int):
             return float(amount_value)
         
         if isinstance(amount_value, str):
-            # Remove currency symbols, commas, spaces
-            cleaned = amount_value.strip().replace(",", "").replace(" ", "")
-            # Remove common currency symbols
-            for symbol in ["$", "€", "£", "₹", "Rs", "rs"]:
-                cleaned = cleaned.replace(symbol, "")
+            # Remove currency symbols, commas, spaces (float() tolerates the remaining outer whitespace)
+            cleaned = amount_value.translate(_AMOUNT_TRANSLATION)
+            if "s" in cleaned:
+                cleaned = _RUPEE_PATTERN.sub("", cleaned)
             
             try:
                 return float(cleaned)
@@ -214,21 +299,64 @@ class BankTransactionsParser(ABC):
             raise ValueError(f"Could not convert to float: {amount_value} - {e}")
 
 
+    def normalize_amount_column(self, amounts: pd.Series) -> pd.Series:
+        """
+        Vectorized normalize_amount for a whole column.
+        
+        Args:
+            amounts: Series of amounts in various formats (string, number, etc.)
+            
+        Returns:
+            float Series, with NaN where the value is missing or cannot be converted
+        """
+        if pd.api.types.is_numeric_dtype(amounts):
+            return amounts.astype(float)
+        # Remove commas, whitespace and common currency symbols
+        cleaned = amounts.astype(str).str.replace(r"[,\s$€£₹]|Rs|rs", "", regex=True)
+        return pd.to_numeric(cleaned, errors="coerce").astype(float).where(amounts.notna())
+    
+    def normalize_text_column(self, df: pd.DataFrame, column: str) -> pd.Series:
+        """
+        Convert an optional text column to str values, with None where missing.
+        
+        Args:
+            df: The DataFrame holding the column
+            column: Column name (may be absent from df)
+            
+        Returns:
+            object Series aligned with df
+        """
+        if column not in df.columns:
+            return pd.Series([None] * len(df), index=df.index, dtype=object)
+        values = df[column]
+        return values.astype(str).where(values.notna(), None)
+
+
 class TransactionsParserRegistry:
     """Registry for bank-specific parsers."""
     
     def __init__(self):
         self._parsers: List[BankTransactionsParser] = []
+        # Lowercased bank name -> parser, so lookups never scan the registered parsers
+        self._parsers_by_bank_name: Dict[str, BankTransactionsParser] = {}
     
     def register(self, parser: BankTransactionsParser):
         """Register a bank parser."""
         self._parsers.append(parser)
+        # The first parser registered for a bank name wins
+        self._parsers_by_bank_name.setdefault(parser.get_bank_name().lower(), parser)
         logger.info(f"Registered parser for bank: {parser.get_bank_name()}")
     
     def get_parser_by_bank_name(self, bank_name: str) -> Optional[BankTransactionsParser]:
         """Get parser by bank name."""
+        return self._parsers_by_bank_name.get(bank_name.lower())
+    
+    def find_parser(self, df: pd.DataFrame, filename: Optional[str] = None) -> Optional[BankTransactionsParser]:
+        """Return the first registered parser whose can_parse accepts the DataFrame, or None."""
+        # Lowercase the column names once for all the parsers
+        columns_lower = BankTransactionsParser.lowercase_columns(df)
         for parser in self._parsers:
-            if parser.get_bank_name().lower() == bank_name.lower():
+            if parser.can_parse(df, filename, columns_lower=columns_lower):
                 return parser
         return None
 
@@ -257,15 +385,18 @@ class TransactionsFileParser:
     
     def parse_file(
         self,
-        file_path: Path,
-        bank_name: str
+        file_path: FileSource,
+        bank_name: str,
+        filename: Optional[str] = None
     ) -> pd.DataFrame:
         """
         Parse a file and return standardized transactions as a DataFrame.
         
         Args:
-            file_path: Path to the file to parse
+            file_path: Path to the file to parse, or binary file object with its content
             bank_name: Bank name to force a specific parser
+            filename: Name of the file (its extension selects the reader). Required for a file object,
+                defaults to the name of the path otherwise
             
         Returns:
             DataFrame with standardized transaction columns:
@@ -281,6 +412,8 @@ class TransactionsFileParser:
         Raises:
             ValueError: If file cannot be parsed or no suitable parser found
         """        
+        file_name = filename or file_path.name
+        
         # Find appropriate parser
         if bank_name:
             parser = self.registry.get_parser_by_bank_name(bank_name)
@@ -288,15 +421,21 @@ class TransactionsFileParser:
                 raise ValueError(f"No parser registered for bank: {bank_name}")
         else:
             raise ValueError(
-                f"No suitable parser found for file: {file_path.name}. "
+                f"No suitable parser found for file: {file_name}. "
                 "Please register a parser for this bank format."
             )
         
+        # Work on a copy of the registered parser, which is shared by every TransactionsFileParser:
+        # the raw DataFrame it keeps then belongs to this file, even with concurrent parses
+        parser = copy.copy(parser)
+        
         # Store parser reference for raw data access
         self._current_parser = parser
         
         # Read file
-        df = self.file_reader.read_file(file_path, skiprows=parser.skiprows, skipfooter=parser.skipfooter)
+        df = self.file_reader.read_file(
+            file_path, skiprows=parser.skiprows, skipfooter=parser.skipfooter, filename=file_name
+        )
         
         if df.empty:
             raise ValueError("File is empty or contains no data")
@@ -304,9 +443,9 @@ class TransactionsFileParser:
         # Parse using the selected parser
         try:
             result_df = parser.parse(df)
-            logger.info(f"Parsed {len(result_df)} transactions from {file_path.name}")
+            logger.info(f"Parsed {len(result_df)} transactions from {file_name}")
         except Exception as e:
-            logger.error(f"Error parsing file {file_path.name} with parser {parser.get_bank_name()}: {e}")
+            logger.error(f"Error parsing file {file_name} with parser {parser.get_bank_name()}: {e}")
             raise
 
         # Check if there are duplicate transactions, if so raise a warning displaying the duplicate transactions and sum the amounts
@@ -339,12 +478,16 @@ class ExampleBankTransactionsParser(BankTransactionsParser):
     def get_bank_name(self) -> str:
         return "Example Bank"
     
-    def can_parse(self, df: pd.DataFrame, filename: Optional[str] = None) -> bool:
+    def can_parse(
+        self,
+        df: pd.DataFrame,
+        filename: Optional[str] = None,
+        *,
+        columns_lower: Optional[FrozenSet[str]] = None
+    ) -> bool:
         return True
     
     def parse(self, df: pd.DataFrame) -> pd.DataFrame:
-        transactions_data = []
-        
         # Clean column names (lowercase, strip whitespace)
         df.columns = df.columns.str.lower().str.strip()
         
@@ -355,31 +498,24 @@ class ExampleBankTransactionsParser(BankTransactionsParser):
         description_col = "description"
         category_col = "category"
         
-        for _, row in df.iterrows():
-            try:
-                # Extract and normalize data
-                trans_date = self.normalize_date(row[date_col])
-                amount = self.normalize_amount(row[amount_col])
-                description = str(row[description_col]) if pd.notna(row.get(description_col)) else None
-                category = str(row[category_col]) if pd.notna(row.get(category_col)) else None
-                
-                transactions_data.append({
-                    "bank_name": self.get_bank_name(),
-                    "date": trans_date,
-                    "amount": amount,
-                    "description": description,
-                    "details": None,
-                    "category": category,
-                    "transaction_type": None,
-                    "is_special": False
-                })
-            except Exception as e:
-                logger.warning(f"Skipping row due to error: {e}")
-                continue
+        # Normalize whole columns at once and drop the rows that could not be parsed
+        dates = self.normalize_date_column(df[date_col])
+        amounts = self.normalize_amount_column(df[amount_col])
+        valid = dates.notna() & amounts.notna()
+        if not valid.all():
+            logger.warning(f"Skipping {int((~valid).sum())} rows with an invalid date or amount")
         
-        # Convert to DataFrame
-        result_df = pd.DataFrame(transactions_data)
-        return result_df
+        result_df = pd.DataFrame({
+            "bank_name": self.get_bank_name(),
+            "date": dates.dt.date,
+            "amount": amounts,
+            "description": self.normalize_text_column(df, description_col),
+            "details": None,
+            "category": self.normalize_text_column(df, category_col),
+            "transaction_type": None,
+            "is_special": False
+        })
+        return result_df[valid].reset_index(drop=True)
 
 
 # Register example parser (can be removed or kept for testing)
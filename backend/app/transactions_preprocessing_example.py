@@ -17,7 +17,10 @@ from .transactions_preprocessing import (
     dataframe_to_list
 )
 import pandas as pd
-from typing import Optional
+import logging
+from typing import FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
 
 
 class MyBankParser(BankTransactionsParser):
@@ -30,7 +33,13 @@ class MyBankParser(BankTransactionsParser):
     def get_bank_name(self) -> str:
         return "my_bank"  # Replace with your bank name
     
-    def can_parse(self, df: pd.DataFrame, filename: Optional[str] = None) -> bool:
+    def can_parse(
+        self,
+        df: pd.DataFrame,
+        filename: Optional[str] = None,
+        *,
+        columns_lower: Optional[FrozenSet[str]] = None
+    ) -> bool:
         """
         Implement logic to detect if this file is from your bank.
         
@@ -39,9 +48,11 @@ class MyBankParser(BankTransactionsParser):
         - Check for specific values in cells
         - Check filename pattern
         """
-        # Example: Check for specific columns
-        columns_lower = [col.lower() for col in df.columns]
-        return "transaction_date" in columns_lower and "amount" in columns_lower
+        # Example: Check for specific columns (columns_lower is passed in by
+        # TransactionsParserRegistry.find_parser, which computes it once for all parsers)
+        if columns_lower is None:
+            columns_lower = self.lowercase_columns(df)
+        return {"transaction_date", "amount"} <= columns_lower
     
     def parse(self, df: pd.DataFrame, filename: Optional[str] = None) -> pd.DataFrame:
         """
@@ -50,11 +61,9 @@ class MyBankParser(BankTransactionsParser):
         Steps:
         1. Clean column names
         2. Map bank columns to standard fields
-        3. Normalize dates and amounts
+        3. Normalize dates and amounts (column-wise)
         4. Create DataFrame with standardized transaction columns
         """
-        transactions_data = []
-        
         # Clean column names
         df.columns = df.columns.str.lower().str.strip()
         
@@ -65,33 +74,26 @@ class MyBankParser(BankTransactionsParser):
         description_col = "description"  # Your bank's description column
         category_col = "category"  # Optional
         
-        for _, row in df.iterrows():
-            try:
-                # Extract and normalize
-                trans_date = self.normalize_date(row[date_col])
-                amount = self.normalize_amount(row[amount_col])
-                description = str(row[description_col]) if pd.notna(row.get(description_col)) else None
-                category = str(row[category_col]) if pd.notna(row.get(category_col)) else None
-                
-                transactions_data.append({
-                    "bank_name": self.get_bank_name(),
-                    "date": trans_date,
-                    "amount": amount,
-                    "description": description,
-                    "details": None,
-                    "category": category,
-                    "account_detais": None,
-                    "transaction_type": None,
-                    "is_special": False
-                })
-            except Exception as e:
-                # Log and skip invalid rows
-                print(f"Skipping row: {e}")
-                continue
+        # Normalize whole columns at once (much faster than iterating over rows)
+        dates = self.normalize_date_column(df[date_col])
+        amounts = self.normalize_amount_column(df[amount_col])
+        valid = dates.notna() & amounts.notna()
+        if not valid.all():
+            # Log one summary line and skip invalid rows
+            logger.warning(f"Skipped {int((~valid).sum())} invalid rows (invalid date or amount)")
         
-        # Convert to DataFrame
-        result_df = pd.DataFrame(transactions_data)
-        return result_df
+        result_df = pd.DataFrame({
+            "bank_name": self.get_bank_name(),
+            "date": dates.dt.date,
+            "amount": amounts,
+            "description": self.normalize_text_column(df, description_col),
+            "details": None,
+            "category": self.normalize_text_column(df, category_col),
+            "account_detais": None,
+            "transaction_type": None,
+            "is_special": False
+        })
+        return result_df[valid].reset_index(drop=True)
 
 
 def example_usage():
@@ -156,8 +158,8 @@ def example_testing_parser():
         df = my_parser.parse(sample_data)
         print(f"Parsed {len(df)} transactions")
         
-        for _, row in df.iterrows():
-            print(f"{row['date']}: {row['amount']} - {row['description']}")
+        for trans_date, amount, description in df[["date", "amount", "description"]].itertuples(index=False, name=None):
+            print(f"{trans_date}: {amount} - {description}")
     else:
         print("Parser cannot handle this format")
 
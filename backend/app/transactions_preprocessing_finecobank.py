@@ -19,7 +19,7 @@ from .transaction_type_mappings import (
 import pandas as pd
 import logging
 import argparse
-from typing import Optional
+from typing import FrozenSet, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +34,13 @@ class FinecoBankParser(BankTransactionsParser):
     def get_bank_name(self) -> str:
         return "fineco"  # Use lowercase for consistency  
     
-    def can_parse(self, df: pd.DataFrame, filename: Optional[str] = None) -> bool:
+    def can_parse(
+        self,
+        df: pd.DataFrame,
+        filename: Optional[str] = None,
+        *,
+        columns_lower: Optional[FrozenSet[str]] = None
+    ) -> bool:
         """
         Implement logic to detect if this file is from FinecoBank.
         
@@ -43,9 +49,10 @@ class FinecoBankParser(BankTransactionsParser):
         - Check for specific values in cells
         - Check filename pattern
         """
-        df.columns = df.columns.str.lower().str.strip()
-        
-        return "data_valuta" in df.columns
+        if columns_lower is None:
+            columns_lower = self.lowercase_columns(df)
+
+        return {"data_valuta"} <= columns_lower
 
     def _extract_transaction_type_finecobank(self, raw_transaction_type: str, amount: float) -> str:
         """
@@ -109,14 +116,20 @@ class FinecoBankParser(BankTransactionsParser):
         details_col = "dettagli"
         transaction_type_col = "tipo_transazione"
         
-        for idx, row in df.iterrows():
+        skipped_rows = 0
+        first_error: Optional[Exception] = None
+        # Plain tuples of the needed columns (missing ones read as NaN), much cheaper than iterrows()
+        rows = df.reindex(columns=[
+            date_col, amount_col, description_col, details_col, transaction_type_col
+        ]).itertuples(index=True, name=None)
+        for idx, raw_date, raw_amount, raw_description, raw_details, raw_transaction_type in rows:
             try:
                 # Extract and normalize
-                trans_date = self.normalize_date(row[date_col])
-                amount = self.normalize_amount(row[amount_col])
-                description = str(row[description_col]) if pd.notna(row.get(description_col)) else None
-                details = str(row[details_col]) if pd.notna(row.get(details_col)) else None
-                transaction_type = str(row[transaction_type_col]) if pd.notna(row.get(transaction_type_col)) else None
+                trans_date = self.normalize_date(raw_date)
+                amount = self.normalize_amount(raw_amount)
+                description = str(raw_description) if pd.notna(raw_description) else None
+                details = str(raw_details) if pd.notna(raw_details) else None
+                transaction_type = str(raw_transaction_type) if pd.notna(raw_transaction_type) else None
                 
                 transactions_data.append({
                     "bank_name": self.get_bank_name(),
@@ -129,9 +142,15 @@ class FinecoBankParser(BankTransactionsParser):
                     "_raw_idx": idx  # Preserve original index for raw data matching
                 })
             except Exception as e:
-                # Log and skip invalid rows
-                print(f"Skipping row: {e}")
+                # Skip invalid rows, logging a single summary below instead of one message per row
+                skipped_rows += 1
+                if first_error is None:
+                    first_error = e
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Skipping row {idx}: {e}")
                 continue
+        if skipped_rows:
+            logger.warning(f"Skipped {skipped_rows} invalid rows (first error: {first_error})")
         
         # Convert to DataFrame
         result_df = pd.DataFrame(transactions_data)
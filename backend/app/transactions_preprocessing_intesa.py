@@ -21,7 +21,7 @@ from .transaction_type_mappings import (
     PAGAMENTO_CON_CARTA
 )
 import pandas as pd
-from typing import Optional
+from typing import FrozenSet, Optional
 
 
 class IntesaParser(BankTransactionsParser):
@@ -35,7 +35,13 @@ class IntesaParser(BankTransactionsParser):
     def get_bank_name(self) -> str:
         return "intesa"  
     
-    def can_parse(self, df: pd.DataFrame, filename: Optional[str] = None) -> bool:
+    def can_parse(
+        self,
+        df: pd.DataFrame,
+        filename: Optional[str] = None,
+        *,
+        columns_lower: Optional[FrozenSet[str]] = None
+    ) -> bool:
         """
         Implement logic to detect if this file is from Intesa bank.
         
@@ -44,9 +50,10 @@ class IntesaParser(BankTransactionsParser):
         - Check for specific values in cells
         - Check filename pattern
         """
-        df.columns = df.columns.str.lower().str.strip()
+        if columns_lower is None:
+            columns_lower = self.lowercase_columns(df)
 
-        return "data" in df.columns and "importo" in df.columns
+        return {"data", "importo"} <= columns_lower
 
     def _extract_description_intesa(self, operazione: str, dettagli: str, conto_o_carta: str) -> str:
         """
@@ -164,8 +171,11 @@ class IntesaParser(BankTransactionsParser):
             logger.warning(df[df['operazione'] == "Disposizione Di Bonifico"])
             df = df[df['operazione'] != "Disposizione Di Bonifico"]
 
-        df['descrizione'] = df.apply(lambda row: self._extract_description_intesa(row['operazione'], row['dettagli'], row['conto o carta']), axis=1)
-        df['tipo_transazione'] = df.apply(lambda row: self._extract_transaction_type_intesa(row['operazione'], row['dettagli'], row['conto o carta']), axis=1)
+        # Zip the three source columns once, rather than df.apply(axis=1), which builds a Series per row
+        # (twice) just to read three of its fields
+        source_values = list(zip(df['operazione'].tolist(), df['dettagli'].tolist(), df['conto o carta'].tolist()))
+        df['descrizione'] = [self._extract_description_intesa(*values) for values in source_values]
+        df['tipo_transazione'] = [self._extract_transaction_type_intesa(*values) for values in source_values]
         df['dettagli'] = df['dettagli'] + " - " + df['conto o carta']
         # Map your bank's columns to standard fields
         # Adjust these based on your actual file format
@@ -176,15 +186,21 @@ class IntesaParser(BankTransactionsParser):
         category_col = "categoria"  
         transaction_type_col = "tipo_transazione"
         
-        for idx, row in df.iterrows():
+        skipped_rows = 0
+        first_error: Optional[Exception] = None
+        # Plain tuples of the needed columns (missing ones read as NaN), much cheaper than iterrows()
+        rows = df.reindex(columns=[
+            date_col, amount_col, description_col, details_col, category_col, transaction_type_col
+        ]).itertuples(index=True, name=None)
+        for idx, raw_date, raw_amount, raw_description, raw_details, raw_category, raw_transaction_type in rows:
             try:
                 # Extract and normalize
-                trans_date = self.normalize_date(row[date_col])
-                amount = self.normalize_amount(row[amount_col])
-                description = str(row[description_col]) if pd.notna(row.get(description_col)) else None
-                details = str(row[details_col]) if pd.notna(row.get(details_col)) else None
-                category = str(row[category_col]) if pd.notna(row.get(category_col)) else None
-                transaction_type = str(row[transaction_type_col].strip()) if pd.notna(row.get(transaction_type_col)) else None  
+                trans_date = self.normalize_date(raw_date)
+                amount = self.normalize_amount(raw_amount)
+                description = str(raw_description) if pd.notna(raw_description) else None
+                details = str(raw_details) if pd.notna(raw_details) else None
+                category = str(raw_category) if pd.notna(raw_category) else None
+                transaction_type = str(raw_transaction_type.strip()) if pd.notna(raw_transaction_type) else None  
                 
                 transactions_data.append({
                     "bank_name": self.get_bank_name(),
@@ -198,9 +214,15 @@ class IntesaParser(BankTransactionsParser):
                     "_raw_idx": idx  # Preserve original index for raw data matching
                 })
             except Exception as e:
-                # Log and skip invalid rows
-                print(f"Skipping row: {e}")
+                # Skip invalid rows, logging a single summary below instead of one message per row
+                skipped_rows += 1
+                if first_error is None:
+                    first_error = e
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Skipping row {idx}: {e}")
                 continue
+        if skipped_rows:
+            logger.warning(f"Skipped {skipped_rows} invalid rows (first error: {first_error})")
         
         # Convert to DataFrame
         result_df = pd.DataFrame(transactions_data)
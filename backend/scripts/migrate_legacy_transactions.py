@@ -22,6 +22,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from app.database import SessionLocal, engine, Base
 from app import models  # noqa: F401 - Import to register models with Base
 from app.models import Transaction
+from app.harmonization import bulk_insert_transactions
 from app.transaction_type_mappings import (
     TRANSACTION_MAP_INTESA,
     TRANSACTION_MAP_ALLIANZ,
@@ -379,7 +380,7 @@ def insert_transactions(df: pd.DataFrame) -> tuple[int, int]:
     logger.info("Database tables created/verified")
     
     db = SessionLocal()
-    inserted_count = 0
+    new_rows = []
     skipped_count = 0
     
     try:
@@ -398,22 +399,20 @@ def insert_transactions(df: pd.DataFrame) -> tuple[int, int]:
                 skipped_count += 1
                 continue
             
-            # Create new transaction
-            transaction = Transaction(
-                bank_name=row['bank_name'],
-                account_name=row['account_name'],
-                date=row['date'],
-                amount=row['amount'],
-                description=row['description'],
-                details=row['details'],
-                category=row['category'],
-                transaction_type=row['transaction_type'],
-                is_special=row['is_special']
-            )
-            
-            db.add(transaction)
-            inserted_count += 1
+            new_rows.append({
+                'bank_name': row['bank_name'],
+                'account_name': row['account_name'],
+                'date': row['date'],
+                'amount': row['amount'],
+                'description': row['description'],
+                'details': row['details'],
+                'category': row['category'],
+                'transaction_type': row['transaction_type'],
+                'is_special': row['is_special']
+            })
         
+        # Insert the new transactions in batches rather than one ORM object at a time
+        inserted_count = len(bulk_insert_transactions(db, new_rows))
         db.commit()
         logger.info(f"Successfully inserted {inserted_count} transactions, skipped {skipped_count} duplicates")
         
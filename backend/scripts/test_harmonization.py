@@ -22,7 +22,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.database import SessionLocal
-from app.transactions_preprocessing import TransactionsFileParser, dataframe_to_list
+from app.transactions_preprocessing import TransactionsFileParser
 from app.transactions_preprocessing_intesa import IntesaParser
 from app.transactions_preprocessing_allianz import AllianzParser
 from app.transactions_preprocessing import register_transactions_parser
@@ -149,10 +149,6 @@ def main():
     # Add account_name to DataFrame (parsers don't include it, it comes from frontend/CLI)
     df['account_name'] = account_name
     
-    # Convert to StandardizedTransaction list
-    transactions = dataframe_to_list(df)
-    logger.info(f"Converted to {len(transactions)} StandardizedTransaction objects")
-    
     # Get database session
     db = SessionLocal()
     
@@ -164,7 +160,7 @@ def main():
         
         result = harmonization.harmonize_and_insert(
             db=db,
-            transactions=transactions,
+            transactions=df,
             bank_name=bank_name,
             account_name=account_name,
             require_confirmation=args.require_confirmation
@@ -177,7 +173,7 @@ def main():
         print(f"Bank: {bank_name}")
         print(f"Account: {account_name}")
         print(f"Last observation date: {result['last_obs_date'] or 'No previous transactions'}")
-        print(f"Transactions processed: {len(transactions)}")
+        print(f"Transactions processed: {len(df)}")
         print(f"New transactions inserted: {result['inserted']}")
         print(f"Duplicate transactions skipped: {result['skipped']}")
         print(f"Confirmation required: {args.require_confirmation}")
@@ -0,0 +1,20 @@
+"""Backend tests.
+
+Run from the backend directory with `python -m unittest discover tests` (or pytest). The app is pointed
+at a throwaway SQLite file: DATABASE_URL is read when app.database is first imported, so it is set here,
+before any test module imports the app.
+"""
+import os
+import tempfile
+
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="finance-tracker-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DATA_DIR, 'finance.db')}"
+
+
+def reset_database() -> None:
+    """Recreate every table of the test database, empty."""
+    from app import models  # noqa: F401
+    from app.database import Base, engine
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
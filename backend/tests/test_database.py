@@ -0,0 +1,49 @@
+"""Tests for app.database."""
+import asyncio
+import unittest
+from unittest import mock
+
+from sqlalchemy import select
+
+from tests import reset_database
+from app import database
+from app.database import ReadSessionLocal, SessionLocal, engine
+
+
+class CloseSessionTest(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+
+    def _close(self, db) -> mock.Mock:
+        """Close a session through _close_session, returning the patched run_in_threadpool."""
+        with mock.patch.object(database, "run_in_threadpool", wraps=database.run_in_threadpool) as run_in_threadpool:
+            asyncio.run(database._close_session(db))
+        return run_in_threadpool
+
+    def test_open_write_transaction_is_closed_in_threadpool(self):
+        db = SessionLocal()
+        db.execute(select(1))
+
+        run_in_threadpool = self._close(db)
+
+        run_in_threadpool.assert_called_once_with(db.close)
+        self.assertFalse(db.in_transaction())
+        self.assertEqual(engine.pool.checkedout(), 0)
+
+    def test_unused_session_is_closed_inline(self):
+        run_in_threadpool = self._close(SessionLocal())
+
+        run_in_threadpool.assert_not_called()
+
+    def test_read_only_sqlite_session_is_closed_inline(self):
+        db = ReadSessionLocal()
+        db.execute(select(1))
+
+        run_in_threadpool = self._close(db)
+
+        run_in_threadpool.assert_not_called()
+        self.assertFalse(db.in_transaction())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests for app.raw_transactions."""
+import unittest
+from datetime import date
+from unittest import mock
+
+import pandas as pd
+from sqlalchemy import func, select
+
+from tests import reset_database
+from app.database import ReadSessionLocal, SessionLocal
+from app.models import IntesaRawTransaction, Transaction
+from app.raw_transactions import insert_raw_transactions_from_dataframe
+
+
+def _intesa_raw_dataframe(row_count: int) -> pd.DataFrame:
+    """Raw Intesa rows as read from an export, with text dates and decimal-comma amounts."""
+    return pd.DataFrame({
+        "data": [f"{day:02d}/01/2024" for day in range(1, row_count + 1)],
+        "operazione": ["Pagamento"] * row_count,
+        "dettagli": [f"Row {index}" for index in range(row_count)],
+        "conto o carta": ["Conto 1"] * row_count,
+        "contabilizzazione": ["CONTABILIZZATO"] * row_count,
+        "categoria": ["Spesa"] * row_count,
+        "valuta": ["EUR"] * row_count,
+        "importo": [f"-{index},50" for index in range(row_count)],
+    })
+
+
+def _committed_count(model) -> int:
+    """Number of rows of a table visible outside the writing session."""
+    with ReadSessionLocal() as read_db:
+        return read_db.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+class InsertRawTransactionsFromDataframeTest(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        self.db = SessionLocal()
+        self.addCleanup(self.db.close)
+
+    def _add_processed_transactions(self, row_count: int) -> list:
+        transactions = [
+            Transaction(bank_name="Intesa", account_name="Main", date=date(2024, 1, day), amount=-1.5)
+            for day in range(1, row_count + 1)
+        ]
+        self.db.add_all(transactions)
+        self.db.flush()
+        return transactions
+
+    def test_commits_once_at_the_end(self):
+        transactions = self._add_processed_transactions(5)
+        committed_at_flush = []
+        flush = self.db.flush
+
+        def checking_flush(*args, **kwargs):
+            committed_at_flush.append((_committed_count(Transaction), _committed_count(IntesaRawTransaction)))
+            return flush(*args, **kwargs)
+
+        with mock.patch.object(self.db, "flush", side_effect=checking_flush), \
+                mock.patch.object(self.db, "commit", wraps=self.db.commit) as commit:
+            inserted_ids = insert_raw_transactions_from_dataframe(
+                _intesa_raw_dataframe(5), transactions, "intesa", self.db, batch_size=1, commit_every=2
+            )
+
+        self.assertEqual(len(inserted_ids), 5)
+        # Flushed every 2 rows, with nothing visible to other connections until the single commit
+        self.assertEqual(committed_at_flush, [(0, 0), (0, 0)])
+        commit.assert_called_once_with()
+        self.assertEqual(_committed_count(Transaction), 5)
+        self.assertEqual(_committed_count(IntesaRawTransaction), 5)
+
+    def test_leaves_commit_to_caller_without_commit_every(self):
+        transactions = self._add_processed_transactions(3)
+
+        with mock.patch.object(self.db, "commit", wraps=self.db.commit) as commit:
+            insert_raw_transactions_from_dataframe(
+                _intesa_raw_dataframe(3), transactions, "intesa", self.db, commit_every=None
+            )
+
+        commit.assert_not_called()
+        self.assertEqual(_committed_count(IntesaRawTransaction), 0)
+        self.db.rollback()
+
+    def test_normalizes_raw_values(self):
+        transactions = self._add_processed_transactions(2)
+
+        insert_raw_transactions_from_dataframe(_intesa_raw_dataframe(2), transactions, "intesa", self.db)
+
+        rows = self.db.execute(
+            select(IntesaRawTransaction.transaction_id, IntesaRawTransaction.data, IntesaRawTransaction.importo)
+            .order_by(IntesaRawTransaction.id)
+        ).all()
+        self.assertEqual(rows, [
+            (transactions[0].id, date(2024, 1, 1), -0.5),
+            (transactions[1].id, date(2024, 1, 2), -1.5),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Tests for the transactions router."""
+import json
+import unittest
+from datetime import date
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from tests import reset_database
+from app.database import SessionLocal, read_engine
+from app.main import app
+from app.models import Transaction
+from app.routers import transactions as transactions_router
+
+
+class GetTransactionsTest(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        self.client = TestClient(app)
+        with SessionLocal() as db:
+            db.add_all([
+                Transaction(bank_name="Intesa", account_name="Main", date=date(2024, 1, day), amount=-float(day),
+                            description=f"Payment {day}", category="Food" if day % 2 else "")
+                for day in (3, 1, 2, 5, 4)
+            ])
+            db.add(Transaction(bank_name="Allianz", account_name="Savings", date=date(2024, 1, 6), amount=100.0))
+            db.commit()
+
+    def _get(self, **params) -> list:
+        response = self.client.get("/api/transactions/", params=params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/json")
+        return json.loads(response.content)
+
+    def test_streamed_body_is_a_json_array_across_batches(self):
+        with mock.patch.object(transactions_router, "STREAM_BATCH_SIZE", 2):
+            body = self._get(bank_name="Intesa")
+
+        self.assertEqual([row["date"] for row in body], [f"2024-01-0{day}" for day in (5, 4, 3, 2, 1)])
+        self.assertEqual(body[0]["description"], "Payment 5")
+        self.assertEqual(body[0]["amount"], -5.0)
+        self.assertEqual(body[0]["category"], "Food")
+        self.assertEqual(body[1]["category"], None)
+        self.assertEqual(set(body[0]), set(self._get(limit=1)[0]))
+
+    def test_empty_result_is_an_empty_array(self):
+        self.assertEqual(self._get(bank_name="Unknown"), [])
+
+    def test_keyset_pages(self):
+        first_page = self._get(bank_name="Intesa", limit=2)
+        last = first_page[-1]
+        second_page = self._get(bank_name="Intesa", limit=2, before_date=last["date"], before_id=last["id"])
+
+        self.assertEqual([row["date"] for row in first_page + second_page],
+                         ["2024-01-05", "2024-01-04", "2024-01-03", "2024-01-02"])
+
+    def test_stream_releases_its_connection(self):
+        self._get()
+
+        self.assertEqual(read_engine.pool.checkedout(), 0)
+
+    def test_database_error_is_reported_before_streaming(self):
+        session = mock.Mock()
+        session.execute.side_effect = OperationalError("SELECT", {}, Exception("disk I/O error"))
+        client = TestClient(app, raise_server_exceptions=False)
+
+        with mock.patch.object(transactions_router, "ReadSessionLocal", return_value=session):
+            response = client.get("/api/transactions/")
+
+        self.assertEqual(response.status_code, 500)
+        session.close.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for the upload router."""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from tests import reset_database
+from app.database import SessionLocal
+from app.main import app
+from app.models import PreprocessingJob
+from app.routers import upload
+from app.transactions_preprocessing import TransactionsFileParser
+
+
+class PreprocessingJobsTest(unittest.TestCase):
+    def setUp(self):
+        reset_database()
+        self.client = TestClient(app)
+        data_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(data_dir.cleanup)
+        self.data_dir = Path(data_dir.name)
+        patcher = mock.patch.object(upload, "DATA_DIR", self.data_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parser_error_fails_the_job(self):
+        with mock.patch.object(TransactionsFileParser, "parse_file", side_effect=ValueError("Unexpected columns")):
+            # TestClient runs the background task before returning the response
+            response = self.client.post(
+                "/api/upload/preprocess/jobs",
+                files={"file": ("export.csv", b"a,b\n1,2\n")},
+                data={"bank_name": "intesa", "account_name": "Main"},
+            )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+
+        job = self.client.get(f"/api/upload/preprocess/jobs/{job_id}").json()
+
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "Error parsing file: Unexpected columns")
+        self.assertIsNone(job["result"])
+        self.assertEqual(list(self.data_dir.iterdir()), [])
+
+    def test_interrupted_jobs_are_failed_at_startup(self):
+        with SessionLocal() as db:
+            db.execute(insert(PreprocessingJob), [
+                {"id": "queued1", "status": "queued"},
+                {"id": "running1", "status": "running"},
+                {"id": "done1", "status": "done", "result_json": "{}"},
+            ])
+            db.commit()
+        for name in ("temp_queued1_a.csv", "temp_running1_b.xlsx", "temp_other_c.csv"):
+            (self.data_dir / name).write_bytes(b"")
+
+        upload.fail_interrupted_preprocessing_jobs()
+
+        with SessionLocal() as db:
+            jobs = dict(db.execute(select(PreprocessingJob.id, PreprocessingJob.status)).all())
+            error = db.get(PreprocessingJob, "running1").error
+        self.assertEqual(jobs, {"queued1": "failed", "running1": "failed", "done1": "done"})
+        self.assertIn("server restart", error)
+        self.assertEqual([path.name for path in self.data_dir.iterdir()], ["temp_other_c.csv"])
+
+
+if __name__ == "__main__":
+    unittest.main()